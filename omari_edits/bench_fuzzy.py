@@ -0,0 +1,94 @@
+# Benchmark spelling correction: trigram FuzzyIndex vs an edit-distance scan of the vocabulary.
+#
+#   python bench_fuzzy.py                       # 1k, 10k and 100k vocabulary words
+#   python bench_fuzzy.py --sizes 50000 --queries 2000
+#
+# Queries are vocabulary words with one or two random edits. p50 and p99
+# lookup latency are reported for both paths, along with the share of the
+# scan's corrections the index also finds (a transposition combined with a
+# second edit can move a long word out of reach of the trigram filter).
+
+import argparse
+import logging
+import random
+import string
+import time
+
+import main
+
+def make_vocabulary(n, seed):
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < n:
+        words.add(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12))))
+    return sorted(words)
+
+def misspell(word, rng):
+    """`word` with one random edit, two if it is long"""
+    for _ in range(2 if len(word) >= main.FUZZY_LONG_WORD else 1):
+        i = rng.randrange(len(word))
+        edit = rng.choice(['insert', 'delete', 'substitute', 'transpose'])
+        if edit == 'insert':
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+        elif edit == 'delete' and len(word) > main.FUZZY_MIN_WORD:
+            word = word[:i] + word[i + 1:]
+        elif edit == 'transpose' and i + 1 < len(word):
+            word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+        else:
+            word = word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+    return word
+
+def scan_lookup(vocabulary, word):
+    limit = 2 if len(word) >= main.FUZZY_LONG_WORD else 1
+    best = None
+    for candidate in vocabulary:
+        distance = main.edit_distance(word, candidate, limit)
+        if distance <= limit and (best is None or (distance, candidate) < best):
+            best = (distance, candidate)
+    return best[1] if best else None
+
+def percentiles(times):
+    times = sorted(times)
+    return (times[len(times) // 2] * 1000, times[min(len(times) - 1, int(len(times) * 0.99))] * 1000)
+
+def timed_lookups(lookup, queries):
+    times = []
+    found = []
+    for query in queries:
+        start = time.perf_counter()
+        found.append(lookup(query))
+        times.append(time.perf_counter() - start)
+    return found, percentiles(times)
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='Benchmark spelling correction lookups')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--scan-queries', type=int, default=50, help='queries timed for the scan')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = random.Random(1)
+
+    print("Spelling correction lookup latency (ms)")
+    for n in args.sizes:
+        vocabulary = make_vocabulary(n, seed=n)
+        index = main.FuzzyIndex()
+        start = time.perf_counter()
+        for word in vocabulary:
+            index.add(word)
+        build = time.perf_counter() - start
+        queries = [misspell(rng.choice(vocabulary), rng) for _ in range(args.queries)]
+
+        # Uncached lookups: the cache would otherwise answer repeated queries
+        indexed, (p50, p99) = timed_lookups(index._lookup, queries)
+        scanned, (s50, s99) = timed_lookups(lambda q: scan_lookup(vocabulary, q), queries[:args.scan_queries])
+        corrected = [a for a, b in zip(indexed, scanned) if b is not None]
+        recall = sum(a is not None for a in corrected) / max(len(corrected), 1)
+        print(f"  {n:>8,} words  index p50 {p50:6.3f}  p99 {p99:6.3f}  "
+              f"scan p50 {s50:8.2f}  p99 {s99:8.2f}  recall {recall:5.1%}  (index built in {build:.2f}s)")
+
+    main.driver_pool.shutdown()
+
+if __name__ == '__main__':
+    main_cli()
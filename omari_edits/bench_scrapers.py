@@ -0,0 +1,78 @@
+# Benchmark the scrapers against recorded fixtures (no network or Chrome needed).
+#
+#   python bench_scrapers.py                 # parse throughput + end-to-end latency
+#   python bench_scrapers.py --latency live  # simulate realistic page/scroll/click delays
+#   python bench_scrapers.py --fixtures path/to/recorded/pages
+#
+# Reports providers parsed per second for the Maps feed and search page parsers,
+# and end-to-end scrape latency for both scrapers with waits simulated.
+
+import argparse
+import logging
+import statistics
+import time
+
+import main
+from replay import FIXTURES_DIR, LIVE_LATENCY, NO_LATENCY, load_fixture
+
+def bench_parse(label, parse, html, iterations):
+    start = time.perf_counter()
+    parsed = 0
+    for _ in range(iterations):
+        parsed += len(parse(html))
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {parsed / elapsed:>10,.0f} providers/s "
+          f"({elapsed / iterations * 1000:.2f} ms per page, {parsed // iterations} providers)")
+
+def bench_scrape(label, scrape, runs):
+    latencies = []
+    count = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        count = len(scrape('Miami'))
+        latencies.append(time.perf_counter() - start)
+    print(f"  {label:<28} median {statistics.median(latencies):.3f}s  "
+          f"max {max(latencies):.3f}s  ({count} providers)")
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='Benchmark the scrapers against recorded fixtures')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='directory of recorded pages')
+    parser.add_argument('--iterations', type=int, default=200, help='parse iterations per page')
+    parser.add_argument('--runs', type=int, default=3, help='end-to-end scrape runs')
+    parser.add_argument('--latency', choices=['none', 'live'], default='none',
+                        help='simulated page/scroll/click delays')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    latency = LIVE_LATENCY if args.latency == 'live' else NO_LATENCY
+
+    feed_html = load_fixture(args.fixtures, 'maps_feed.html')
+    search_html = load_fixture(args.fixtures, 'search.html')
+
+    print(f"Parse throughput ({args.iterations} iterations)")
+    bench_parse('maps feed (bulk)', main.parse_maps_feed, feed_html, args.iterations)
+    bench_parse('search results', main.parse_insurance_results, search_html, args.iterations)
+
+    server = main.enable_replay(args.fixtures, latency=latency)
+    # Stop at the recorded feed size so runs do not end on a scroll timeout
+    main.MAPS_RESULT_LIMIT = len(main.parse_maps_feed(feed_html))
+
+    print(f"\nEnd-to-end scrape latency ({args.runs} runs, latency={args.latency})")
+    main.MAPS_BULK_EXTRACTION = True
+    bench_scrape('healthcare (bulk parse)', main.scrape_healthcare_providers, args.runs)
+    main.MAPS_BULK_EXTRACTION = False
+    bench_scrape('healthcare (click each)', main.scrape_healthcare_providers, args.runs)
+    main.MAPS_BULK_EXTRACTION = True
+    bench_scrape('insurance', main.scrape_insurance_providers, args.runs)
+
+    print("\nWait times")
+    for key, stat in sorted(main.wait_recorder.stats().items()):
+        print(f"  {key:<28} {stat['count']:>4} waits  avg {stat['avg']:.3f}s  "
+              f"max {stat['max']:.3f}s  timeouts {stat['timeouts']}")
+    print(f"  insurance fetch tiers: {main.insurance_fetcher.stats()}")
+
+    server.stop()
+    main.driver_pool.shutdown()
+
+if __name__ == '__main__':
+    main_cli()
@@ -0,0 +1,114 @@
+# Benchmark /suggest typeahead lookups while scrapes keep replacing provider names.
+#
+#   python bench_suggest.py                       # 10k, 50k and 100k providers
+#   python bench_suggest.py --sizes 50000 --rounds 50
+#
+# Providers are spread over locations of 200. Each round re-scrapes a few
+# locations with a share of new names (so suggestions are added, removed and
+# change popularity) and then looks up random 1-4 character prefixes of real
+# names. p50, p99 and max lookup latency are reported, along with the first
+# lookup of every one-letter prefix and the time to bulk-load the index. Lookups
+# are checked against ranking every suggestion.
+
+import argparse
+import logging
+import random
+import string
+import time
+
+import main
+
+WORDS = ['care', 'health', 'medical', 'family', 'clinic', 'center', 'pediatric', 'dental', 'urgent',
+         'heart', 'skin', 'ortho', 'vision', 'women', 'north', 'south', 'baptist', 'memorial', 'mercy',
+         'sunrise', 'ocean', 'coastal', 'palm', 'bay', 'city', 'county', 'primary', 'wellness', 'physicians',
+         'associates', 'group', 'partners', 'institute', 'hospital', 'pharmacy', 'lab', 'imaging', 'therapy']
+LOCATION_SIZE = 200
+
+def make_name(rng):
+    words = rng.sample(WORDS, rng.randint(2, 4))
+    # Some names are shared across locations (chains), most are local
+    if rng.random() < 0.7:
+        words.append(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8))))
+    return ' '.join(word.title() for word in words)
+
+def make_location(rng):
+    return [(make_name(rng), 'provider') for _ in range(LOCATION_SIZE)]
+
+def percentiles(times):
+    times = sorted(times)
+    return (times[len(times) // 2] * 1000, times[min(len(times) - 1, int(len(times) * 0.99))] * 1000,
+            times[-1] * 1000)
+
+def brute_force(index, prefix, limit):
+    text = main.suggestion_text(prefix) + (' ' if prefix[-1:].isspace() else '')
+    ranks = {}
+    for (name, kind) in index._entries:
+        for suffix in main.word_suffixes(name):
+            if suffix.startswith(text):
+                rank = index._rank(suffix, name, kind)
+                ranks[(name, kind)] = min(rank, ranks.get((name, kind), rank))
+    return [(name, kind) for *_, name, kind in sorted(ranks.values())[:limit]]
+
+def main_cli():
+    parser = argparse.ArgumentParser(description='Benchmark typeahead lookups under re-scrapes')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 50000, 100000])
+    parser.add_argument('--rounds', type=int, default=100, help='re-scrape rounds')
+    parser.add_argument('--lookups', type=int, default=50, help='lookups per round')
+    parser.add_argument('--changed', type=float, default=0.3, help='share of names a re-scrape changes')
+    parser.add_argument('--checks', type=int, default=200, help='lookups compared with ranking everything')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    print("Typeahead lookup latency (ms) while locations are re-scraped")
+    for n in args.sizes:
+        rng = random.Random(n)
+        index = main.SuggestionIndex()
+        locations = [make_location(rng) for _ in range(max(n // LOCATION_SIZE, 1))]
+        # Loaded the way warm_provider_cache loads the disk cache at startup
+        start = time.perf_counter()
+        with index.bulk():
+            for i, suggestions in enumerate(locations):
+                index.replace(i, suggestions)
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for letter in string.ascii_lowercase:
+            index.suggest(letter, main.SUGGEST_MAX_LIMIT)
+        first_letters = (time.perf_counter() - start) * 1000 / len(string.ascii_lowercase)
+
+        times = []
+        replace_times = []
+        mismatches = 0
+        checks = 0
+        for _ in range(args.rounds):
+            for _ in range(3):
+                i = rng.randrange(len(locations))
+                locations[i] = [pair if rng.random() >= args.changed else (make_name(rng), 'provider')
+                                for pair in locations[i]]
+                start = time.perf_counter()
+                index.replace(i, locations[i])
+                replace_times.append(time.perf_counter() - start)
+            for _ in range(args.lookups):
+                name = main.suggestion_text(rng.choice(rng.choice(locations))[0])
+                word = rng.choice(main.word_suffixes(name))
+                prefix = word[:rng.randint(1, 4)]
+                start = time.perf_counter()
+                found = index.suggest(prefix, main.SUGGEST_MAX_LIMIT)
+                times.append(time.perf_counter() - start)
+                if checks < args.checks and rng.random() < 0.05:
+                    checks += 1
+                    expected = brute_force(index, prefix, main.SUGGEST_MAX_LIMIT)
+                    if [(main.suggestion_text(s['text']), s['kind']) for s in found] != expected:
+                        mismatches += 1
+
+        p50, p99, worst = percentiles(times)
+        r50, r99, _ = percentiles(replace_times)
+        print(f"  {n:>8,} providers  lookup p50 {p50:6.3f}  p99 {p99:6.3f}  max {worst:7.3f}  "
+              f"first one-letter lookup {first_letters:6.3f}  re-scrape p50 {r50:6.1f}  p99 {r99:6.1f}  "
+              f"(loaded in {load:.1f}s, {mismatches}/{checks} mismatches)")
+
+    main.driver_pool.shutdown()
+
+if __name__ == '__main__':
+    main_cli()
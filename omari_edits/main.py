@@ -4,11 +4,15 @@
 # def home():
 #     return "Sup, Berry!"
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, g, has_request_context, Response, stream_with_context
 from datetime import datetime
 import json
+import numpy as np
+import sqlite3
 import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 from selenium import webdriver
@@ -18,10 +22,23 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 import time
 import threading
-from queue import Queue
+from collections import OrderedDict, deque
+from queue import Queue, PriorityQueue, Empty
+import itertools
+import bisect
+import heapq
+import base64
+import functools
+import math
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import atexit
 import logging
+import os
+import sys
 
 app = Flask(__name__)
 
@@ -37,25 +54,1846 @@ chrome_options.add_argument('--disable-gpu')
 chrome_options.add_argument('--no-sandbox')
 chrome_options.add_argument('--disable-dev-shm-usage')
 
-# Cache for scraped data
+# Driver pool settings
+DRIVER_POOL_SIZE = 4  # max live Chrome instances (one per source per scrape worker)
+DRIVER_MAX_PAGES = 20  # recycle a driver after this many scrapes
+DRIVER_CHECKOUT_TIMEOUT = 120  # seconds to wait for a free driver
+DRIVER_PAGE_LOAD_TIMEOUT = 30  # seconds
+
+# Directory of recorded pages to replay instead of scraping live Google (see replay.py)
+SCRAPER_REPLAY_DIR = os.environ.get('SCRAPER_REPLAY_DIR')
+
+# Google Maps scraping settings
+MAPS_RESULT_LIMIT = 40  # max healthcare providers per location
+MAPS_MAX_SCROLLS = 10  # feed scrolls used to reach the limit
+MAPS_BULK_EXTRACTION = True  # parse the feed once instead of clicking every result
+MAPS_DETAIL_FIELDS = ('name', 'address', 'phone')  # missing fields that justify a detail click
+
+# Scraped page URLs
+MAPS_SEARCH_URL = "https://www.google.com/maps/search/{query}"
+
+# Insurance search fetching (plain HTTP first, browser only as a fallback)
+INSURANCE_SEARCH_URL = "https://www.google.com/search?q={query}"
+HTTP_POOL_SIZE = 10  # keep-alive connections per host
+HTTP_RETRIES = 2
+HTTP_TIMEOUT = 10  # seconds
+DEFAULT_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+
+# Upper bounds (seconds) for each DOM wait, per scraped source
+SCRAPER_WAIT_TIMEOUTS = {
+    'maps': {'feed': 15, 'scroll': 4, 'detail': 6},
+    'search': {'results': 10}
+}
+SCRAPER_WAIT_POLL = 0.2  # seconds between condition checks
+
+class WaitRecorder:
+    """Records how long each scraper wait actually took"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, source, name, elapsed, timed_out):
+        with self._lock:
+            stat = self._stats.setdefault(f"{source}.{name}", {
+                'count': 0, 'timeouts': 0, 'total': 0.0, 'max': 0.0
+            })
+            stat['count'] += 1
+            stat['timeouts'] += 1 if timed_out else 0
+            stat['total'] += elapsed
+            stat['max'] = max(stat['max'], elapsed)
+
+    def stats(self):
+        with self._lock:
+            return {
+                key: {
+                    'count': stat['count'],
+                    'timeouts': stat['timeouts'],
+                    'avg': round(stat['total'] / stat['count'], 3),
+                    'max': round(stat['max'], 3),
+                    'total': round(stat['total'], 3),
+                    'timeout_limit': SCRAPER_WAIT_TIMEOUTS[key.split('.')[0]][key.split('.')[1]]
+                }
+                for key, stat in self._stats.items()
+            }
+
+wait_recorder = WaitRecorder()
+
+def wait_for(driver, source, name, condition):
+    """Wait on a DOM condition using the source's timeout and record the real wait time.
+    Returns the condition's result, or None if it timed out.
+    """
+    timeout = SCRAPER_WAIT_TIMEOUTS[source][name]
+    start = time.time()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=SCRAPER_WAIT_POLL).until(condition)
+        timed_out = False
+    except TimeoutException:
+        result = None
+        timed_out = True
+    wait_recorder.record(source, name, time.time() - start, timed_out)
+    return result
+
+def scroll_height_changed(element, previous_height):
+    """Condition: the element's scrollHeight grew past `previous_height`"""
+    def check(driver):
+        return driver.execute_script('return arguments[0].scrollHeight', element) > previous_height
+    return check
+
+def header_text_changed(selector, previous_text):
+    """Condition: the element at `selector` shows non-empty text different from `previous_text`"""
+    def check(driver):
+        elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        text = elements[0].text if elements else ''
+        return text if text and text != previous_text else False
+    return check
+
+class DriverPool:
+    """Bounded pool of headless Chrome drivers shared by the scrapers.
+
+    Drivers are started lazily, health-checked on checkout and recycled
+    after `max_pages` uses so a long-running server does not pay the
+    browser boot cost on every location refresh.
+    """
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES,
+                 checkout_timeout=DRIVER_CHECKOUT_TIMEOUT, driver_factory=None):
+        self.size = size
+        self.driver_factory = driver_factory
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+        self._idle = Queue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._pages = {}
+        self._driver_path = None
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'created': 0,
+            'recycled': 0,
+            'unhealthy': 0,
+            'timeouts': 0,
+            'total_wait': 0.0,
+            'max_wait': 0.0
+        }
+
+    def _create_driver(self):
+        if self.driver_factory is not None:
+            driver = self.driver_factory()
+        else:
+            # ChromeDriverManager hits the network, so resolve the binary once
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+            driver = webdriver.Chrome(service=Service(self._driver_path), options=chrome_options)
+        driver.set_page_load_timeout(DRIVER_PAGE_LOAD_TIMEOUT)
+        with self._lock:
+            self._pages[id(driver)] = 0
+            self._stats['created'] += 1
+        return driver
+
+    def is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, driver):
+        with self._lock:
+            self._pages.pop(id(driver), None)
+            self._live -= 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing pooled driver: {str(e)}")
+
+    def checkout(self, timeout=None):
+        """Take a driver from the pool, starting one if the pool has room"""
+        if self._closed:
+            raise RuntimeError('Driver pool is shut down')
+
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.time()
+        driver = None
+
+        while driver is None:
+            try:
+                driver = self._idle.get_nowait()
+            except Empty:
+                with self._lock:
+                    can_create = self._live < self.size
+                    if can_create:
+                        self._live += 1
+                if can_create:
+                    try:
+                        driver = self._create_driver()
+                    except Exception:
+                        with self._lock:
+                            self._live -= 1
+                        raise
+                else:
+                    remaining = timeout - (time.time() - start)
+                    try:
+                        driver = self._idle.get(timeout=max(remaining, 0))
+                    except Empty:
+                        with self._lock:
+                            self._stats['timeouts'] += 1
+                        raise TimeoutError(f"No Chrome driver available after {timeout}s")
+
+            if not self.is_healthy(driver):
+                logger.warning("Discarding unhealthy pooled driver")
+                with self._lock:
+                    self._stats['unhealthy'] += 1
+                self._discard(driver)
+                driver = None
+
+        waited = time.time() - start
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['total_wait'] += waited
+            self._stats['max_wait'] = max(self._stats['max_wait'], waited)
+        return driver
+
+    def checkin(self, driver, healthy=True):
+        """Return a driver to the pool, recycling it if it is worn out"""
+        with self._lock:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+            worn_out = self._pages[id(driver)] >= self.max_pages
+
+        if self._closed or not healthy or worn_out:
+            if healthy and worn_out:
+                with self._lock:
+                    self._stats['recycled'] += 1
+            self._discard(driver)
+            return
+
+        try:
+            driver.delete_all_cookies()
+        except Exception:
+            pass
+        self._idle.put(driver)
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Context manager that checks a driver out and always checks it back in"""
+        driver = self.checkout(timeout)
+        healthy = True
+        try:
+            yield driver
+        except Exception:
+            healthy = self.is_healthy(driver)
+            raise
+        finally:
+            self.checkin(driver, healthy=healthy)
+
+    @contextmanager
+    def optional_driver(self, timeout=None):
+        """Like `driver()`, but yields None when no browser can be started so callers can fall back"""
+        try:
+            driver = self.checkout(timeout)
+        except Exception as e:
+            logger.error(f"Could not check out a pooled driver: {str(e)}")
+            yield None
+            return
+        healthy = True
+        try:
+            yield driver
+        except Exception:
+            healthy = self.is_healthy(driver)
+            raise
+        finally:
+            self.checkin(driver, healthy=healthy)
+
+    def stats(self):
+        with self._lock:
+            checkouts = self._stats['checkouts']
+            return {
+                'pool_size': self.size,
+                'live_drivers': self._live,
+                'idle_drivers': self._idle.qsize(),
+                'max_pages_per_driver': self.max_pages,
+                'checkouts': checkouts,
+                'created': self._stats['created'],
+                'recycled': self._stats['recycled'],
+                'unhealthy': self._stats['unhealthy'],
+                'timeouts': self._stats['timeouts'],
+                'avg_wait': round(self._stats['total_wait'] / checkouts, 3) if checkouts else 0.0,
+                'max_wait': round(self._stats['max_wait'], 3)
+            }
+
+    def shutdown(self):
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(driver)
+
+driver_pool = DriverPool()
+atexit.register(driver_pool.shutdown)
+
+# Cache expiration time (2 hours)
+CACHE_EXPIRATION = 7200  # seconds
+
+# Cache size limits (entries per provider type) and eviction policy ('lru' or 'lfu')
+PROVIDER_CACHE_MAX_ENTRIES = 500
+PROGRESS_CACHE_MAX_ENTRIES = 200
+CACHE_EVICTION_POLICY = 'lru'
+
+class CacheEntry:
+    """A cached value with its own timestamp, TTL, hit count and size"""
+    __slots__ = ('value', 'updated_at', 'ttl', 'hits', 'base', 'size')
+
+    def __init__(self, value, ttl, updated_at=None, base=0):
+        self.value = value
+        self.updated_at = time.time() if updated_at is None else updated_at
+        self.ttl = ttl
+        self.hits = 0
+        self.base = base  # LFU frequency floor: the cache's age when the entry was added
+        self.size = len(value) if hasattr(value, '__len__') else 1
+
+    def frequency(self):
+        return self.base + self.hits
+
+    def is_expired(self, now=None):
+        now = time.time() if now is None else now
+        return now - self.updated_at > self.ttl
+
+    def info(self):
+        return {
+            'updated_at': self.updated_at,
+            'age': round(time.time() - self.updated_at, 1),
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'size': self.size,
+            'expired': self.is_expired()
+        }
+
+class TTLCache:
+    """Bounded dict-like cache with per-key TTLs and LRU/LFU eviction.
+
+    With `serve_stale=True` expired entries stay readable (callers decide
+    when to refresh); otherwise they are dropped on access. Entries for
+    which `pin(value)` is true are never evicted. `on_change(key, value)`
+    is called whenever a key is set, and with value None when it is
+    evicted, popped or dropped as expired. Changes are queued under the
+    cache lock and delivered in order after it is released, so readers
+    never wait on slow callbacks; the call that made a change returns
+    once it has been delivered.
+
+    LFU uses dynamic aging: a new entry starts at the frequency of the
+    last evicted entry, so long-lived hot entries cannot starve new ones.
+    """
+
+    def __init__(self, max_entries, ttl, policy=CACHE_EVICTION_POLICY, serve_stale=True, pin=None,
+                 on_change=None):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError(f"Unknown eviction policy: {policy}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.policy = policy
+        self.serve_stale = serve_stale
+        self.pin = pin
+        self.on_change = on_change
+        self.evictions = 0
+        self._age = 0  # frequency of the last LFU victim
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        self._changes = deque()  # (key, value) waiting for on_change
+        self._queued = 0  # changes ever queued
+        self._delivery_lock = threading.Lock()  # serializes on_change calls, in queue order
+
+    @contextmanager
+    def _locked(self):
+        """Hold the cache lock, then deliver any changes made while holding it.
+        Calls that changed nothing (most reads) never touch the delivery lock.
+        """
+        changed = False
+        try:
+            with self._lock:
+                queued = self._queued
+                try:
+                    yield
+                finally:
+                    changed = self._queued != queued
+        finally:
+            if changed:
+                self._deliver()
+
+    def _deliver(self):
+        # Whoever holds the delivery lock drains the queue, including changes queued by others;
+        # waiting for it means this call's changes have been delivered when it returns
+        with self._delivery_lock:
+            while self._changes:
+                key, value = self._changes.popleft()
+                self.on_change(key, value)
+
+    def _live_entry(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and not self.serve_stale and entry.is_expired():
+            del self._entries[key]
+            self._notify(key, None)
+            return None
+        return entry
+
+    def _evict(self, keep=None):
+        # `keep` is the key just set, which is never its own victim
+        while len(self._entries) > self.max_entries:
+            candidates = [k for k, e in self._entries.items()
+                          if k != keep and not (self.pin and self.pin(e.value))]
+            if not candidates:
+                return
+            if self.policy == 'lfu':
+                # Ties go to the least recently used entry
+                victim = min(candidates, key=lambda k: self._entries[k].frequency())
+                self._age = self._entries[victim].frequency()
+            else:
+                victim = candidates[0]
+            del self._entries[victim]
+            self.evictions += 1
+            self._notify(victim, None)
+
+    def _notify(self, key, value):
+        # Caller holds self._lock; delivered by _locked once it is released
+        if self.on_change is not None:
+            self._changes.append((key, value))
+            self._queued += 1
+
+    def set(self, key, value, ttl=None, updated_at=None):
+        with self._locked():
+            old = self._entries.pop(key, None)
+            entry = CacheEntry(value, self.ttl if ttl is None else ttl, updated_at, base=self._age)
+            if old is not None:
+                entry.hits = old.hits
+                entry.base = old.base
+            self._entries[key] = entry
+            self._notify(key, value)
+            self._evict(keep=key)
+
+    def get_entry(self, key):
+        """Look up an entry, counting a hit and marking it recently used"""
+        with self._locked():
+            entry = self._live_entry(key)
+            if entry is not None:
+                entry.hits += 1
+                self._entries.move_to_end(key)
+            return entry
+
+    def get(self, key, default=None):
+        with self._locked():
+            entry = self._live_entry(key)
+            return default if entry is None else entry.value
+
+    def pop(self, key, default=None):
+        with self._locked():
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return default
+            self._notify(key, None)
+            return entry.value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __getitem__(self, key):
+        with self._locked():
+            entry = self._live_entry(key)
+            if entry is None:
+                raise KeyError(key)
+            return entry.value
+
+    def __contains__(self, key):
+        with self._locked():
+            return self._live_entry(key) is not None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    def values(self):
+        with self._lock:
+            return [e.value for e in self._entries.values()]
+
+    def items(self):
+        with self._lock:
+            return [(k, e.value) for k, e in self._entries.items()]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'policy': self.policy,
+                'evictions': self.evictions,
+                'items': {k: e.info() for k, e in self._entries.items()}
+            }
+
+def is_scraping(progress):
+    return isinstance(progress, dict) and progress.get('status') in ('queued', 'scraping')
+
+# Location canonicalization: free text, ZIP codes and coordinates all map to one key
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gazetteer.json')
+GEO_BUCKET_DEGREES = 0.1  # grid cell size (~11 km) for coordinates away from any known city
+GEO_SNAP_KM = 15  # coordinates within this distance of a known city use that city's key
+EARTH_RADIUS_KM = 6371.0
+KM_PER_MILE = 1.609344
+LOCATION_KEY_CACHE_SIZE = 4096  # memoized location string -> key lookups
+
+ZIP_PATTERN = re.compile(r'\b(\d{5})(?:-\d{4})?\b')
+COORDS_PATTERN = re.compile(r'^\s*(-?\d{1,2}(?:\.\d+)?)\s*,\s*(-?\d{1,3}(?:\.\d+)?)\s*$')
+STATE_SUFFIXES = ('florida', 'fl', 'usa', 'us', 'united states', 'united states of america')
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"Gazetteer not found at {path}; locations are keyed by their normalized text")
+        return {'cities': [], 'zip3': {}, 'zips': {}}
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two points in kilometres"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2 +
+         math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * math.asin(math.sqrt(a))
+
+def haversine_km_array(lat, lon, lats, lons):
+    """Great-circle distances in kilometres from one point to arrays of points"""
+    lat, lon = math.radians(lat), math.radians(lon)
+    lats, lons = np.radians(lats), np.radians(lons)
+    a = (np.sin((lats - lat) / 2) ** 2 +
+         math.cos(lat) * np.cos(lats) * np.sin((lons - lon) / 2) ** 2)
+    return EARTH_RADIUS_KM * 2 * np.arcsin(np.sqrt(a))
+
+def normalize_location_text(location):
+    """Lowercase, drop punctuation and trailing state/country names"""
+    text = re.sub(r'[^\w\s-]', ' ', str(location).lower().replace('.', ''))
+    text = ' '.join(text.split())
+    # Geocoders stack them ("Miami, FL, USA"), so strip until none is left
+    stripped = True
+    while stripped:
+        stripped = False
+        for suffix in STATE_SUFFIXES:
+            if text.endswith(' ' + suffix):
+                text = text[:-len(suffix) - 1]
+                stripped = True
+    return text
+
+class Place:
+    """A canonical location: cache/scrape key, name to scrape with, and coordinates"""
+
+    __slots__ = ('key', 'name', 'latitude', 'longitude')
+
+    def __init__(self, key, name, latitude=None, longitude=None):
+        self.key = key
+        self.name = name
+        self.latitude = latitude
+        self.longitude = longitude
+
+    def to_dict(self):
+        return {'key': self.key, 'name': self.name, 'latitude': self.latitude, 'longitude': self.longitude}
+
+class Gazetteer:
+    """Offline city/ZIP lookup that canonicalizes locations to geo-bucket keys.
+
+    Known cities (by name, alias or ZIP) key as e.g. 'miami-fl'. Coordinates
+    snap to the nearest city within GEO_SNAP_KM, otherwise to a
+    GEO_BUCKET_DEGREES grid cell ('geo:25.8,-80.4'). Anything else keys by
+    its normalized text. Canonicalizing a Place's name returns the same key.
+    """
+
+    def __init__(self, data):
+        self.cities = {}
+        self._names = {}
+        for city in data.get('cities', []):
+            place = Place(f"{normalize_location_text(city['name']).replace(' ', '-')}-{city['state'].lower()}",
+                          city['name'], city['lat'], city['lon'])
+            self.cities[city['name']] = place
+            self._names.setdefault(place.key, place)
+            for name in [city['name'], f"{city['name']} {city['state']}", *city.get('aliases', [])]:
+                self._names.setdefault(normalize_location_text(name), place)
+        self.zips = {z: self.cities[c] for z, c in data.get('zips', {}).items() if c in self.cities}
+        self.zip3 = {z: self.cities[c] for z, c in data.get('zip3', {}).items() if c in self.cities}
+
+    def from_coordinates(self, latitude, longitude):
+        # Snap from the cell center so a bucket's own name maps back to the same bucket
+        lat = round(round(float(latitude) / GEO_BUCKET_DEGREES) * GEO_BUCKET_DEGREES, 4)
+        lon = round(round(float(longitude) / GEO_BUCKET_DEGREES) * GEO_BUCKET_DEGREES, 4)
+        nearest, nearest_km = None, GEO_SNAP_KM
+        for place in self.cities.values():
+            km = haversine_km(lat, lon, place.latitude, place.longitude)
+            if km <= nearest_km:
+                nearest, nearest_km = place, km
+        if nearest is not None:
+            return nearest
+        return Place(f"geo:{lat},{lon}", f"{lat},{lon}", lat, lon)
+
+    def canonicalize(self, location):
+        text = str(location).strip()
+        coords = COORDS_PATTERN.match(text)
+        if coords:
+            return self.from_coordinates(coords.group(1), coords.group(2))
+
+        normalized = normalize_location_text(text)
+        place = self._names.get(normalized)
+        if place is not None:
+            return place
+
+        zip_match = ZIP_PATTERN.search(normalized)
+        if zip_match:
+            # "Miami, FL 33101": prefer the city named alongside the ZIP
+            without_zip = normalize_location_text(ZIP_PATTERN.sub(' ', normalized))
+            zip_code = zip_match.group(1)
+            place = (self._names.get(without_zip) or self.zips.get(zip_code) or
+                     self.zip3.get(zip_code[:3]))
+            if place is not None:
+                return place
+            if not without_zip:
+                return Place(f"zip:{zip_code}", zip_code)
+
+        return Place(normalized, ' '.join(text.split()))
+
+gazetteer = Gazetteer(load_gazetteer())
+
+def canonicalize_location(location):
+    """Map free text, a ZIP code or "lat,lon" to its canonical Place"""
+    return gazetteer.canonicalize(location)
+
+@functools.lru_cache(maxsize=LOCATION_KEY_CACHE_SIZE)
+def location_key(location):
+    """Canonical key used for every cache, scrape and progress lookup of a location"""
+    return canonicalize_location(location).key
+
+# Fields of a provider record; other keys a scraper returns are kept in `extra`
+PROVIDER_FIELDS = ('name', 'location', 'address', 'phone', 'website', 'url', 'rating', 'review_count',
+                   'category', 'latitude', 'longitude', 'specialties', 'insurance', 'coverage_types',
+                   'description', 'source')
+INTERNED_FIELDS = ('location', 'category', 'source')  # repeated across providers, stored once
+
+class ProviderRecord:
+    """Immutable, compact provider record shared by the caches and indexes.
+
+    Reads like the provider dict it was built from (`get`, `[]`, `in`), but
+    list fields become tuples and location, category and source strings are
+    interned. Fields the dict did not have stay unset, so `to_dict` gives the
+    same keys back. Per-search values such as relevance scores are never
+    stored on a record (see ClinicMatches).
+    """
+
+    __slots__ = PROVIDER_FIELDS + ('extra',)
+
+    def __init__(self, data):
+        extra = {}
+        for key, value in data.items():
+            if key not in PROVIDER_FIELDS:
+                extra[key] = value
+                continue
+            if isinstance(value, list):
+                value = tuple(value)
+            elif key in INTERNED_FIELDS and isinstance(value, str):
+                value = sys.intern(value)
+            object.__setattr__(self, key, value)
+        object.__setattr__(self, 'extra', extra or None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('ProviderRecord is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('ProviderRecord is immutable')
+
+    def get(self, key, default=None):
+        if key in PROVIDER_FIELDS:
+            return getattr(self, key, default)
+        return self.extra.get(key, default) if self.extra else default
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in PROVIDER_FIELDS if hasattr(self, field)}
+        for field in ('specialties', 'insurance', 'coverage_types'):
+            if field in data and isinstance(data[field], tuple):
+                data[field] = list(data[field])
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"ProviderRecord({self.get('name')!r})"
+
+_MISSING = object()
+
+def provider_records(providers):
+    """Provider dicts as ProviderRecords (records are passed through)"""
+    return [provider if isinstance(provider, ProviderRecord) else ProviderRecord(provider)
+            for provider in providers or () if isinstance(provider, (dict, ProviderRecord))]
+
+def is_provider(value):
+    return isinstance(value, (dict, ProviderRecord))
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+INDEXED_FIELDS = ('name', 'address', 'specialties', 'insurance')
+MIN_PARTIAL_WORD = 4  # query words shorter than this only match as part of the full query
+CLINICS_GROUP = 'clinics'  # index group holding medical_db['clinics']
+
+# BM25F relevance: per-field weights, term saturation (k1) and length normalization (b)
+BM25_FIELD_WEIGHTS = {'name': 3.0, 'address': 1.0, 'specialties': 2.0, 'insurance': 1.0}
+BM25_K1 = 1.2
+BM25_B = 0.75
+RELEVANCE_SCALE = 10  # relevance_score of the best match in a search
+IDF_CACHE_SIZE = 1024  # queries whose idf is kept for scoring unindexed providers
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text).lower())
+
+def provider_terms(provider):
+    """Per-field term frequencies of a provider's indexed fields.
+    Returns ({token: [tf per field]}, [length per field]) in INDEXED_FIELDS order.
+    """
+    terms = {}
+    lengths = [0] * len(INDEXED_FIELDS)
+    for field_index, field in enumerate(INDEXED_FIELDS):
+        value = provider.get(field)
+        values = value if isinstance(value, (list, tuple)) else [value] if value else []
+        for item in values:
+            for token in tokenize(item):
+                counts = terms.get(token)
+                if counts is None:
+                    counts = terms[token] = [0] * len(INDEXED_FIELDS)
+                counts[field_index] += 1
+                lengths[field_index] += 1
+    return terms, lengths
+
+def provider_specialties(provider):
+    """A provider's distinct specialties, lowercased"""
+    specialties = provider.get('specialties') or ()
+    if not isinstance(specialties, (list, tuple)):
+        return set()
+    return {str(specialty).lower() for specialty in specialties}
+
+class ProviderIndex:
+    """Token inverted index over provider name, address, specialties and insurance.
+
+    Providers are indexed in groups (one per cached location, plus the
+    local clinics) that are replaced wholesale when the cache changes, so
+    searches never rescan every provider. Query words match indexed tokens
+    by prefix. Document frequencies and per-field lengths are kept up to
+    date as groups change, so candidates can be scored with BM25F.
+    Specialty names have postings of their own for specialty lookups.
+    """
+
+    def __init__(self, vocabulary=None):
+        self._lock = threading.RLock()
+        self._vocabulary = vocabulary  # FuzzyIndex told about tokens as they come and go
+        self._ids = itertools.count()
+        self._docs = {}  # doc id -> (group, provider, terms, field lengths)
+        self._groups = {}  # group -> (provider list, doc ids)
+        self._postings = {}  # token -> doc ids
+        self._vocab = []  # sorted tokens, for prefix lookups
+        self._specialties = {}  # lowercased specialty -> doc ids
+        self._field_lengths = [0] * len(INDEXED_FIELDS)  # summed over all docs
+        self._idf_cache = {}  # query words -> idf, until the index changes
+
+    def replace(self, group, providers):
+        """Index `providers` as `group`, dropping whatever the group held before"""
+        with self._lock:
+            self.remove(group)
+            self._idf_cache.clear()
+            if providers is None:
+                return
+            doc_ids = []
+            for provider in providers:
+                if not is_provider(provider):
+                    continue
+                doc_id = next(self._ids)
+                terms, lengths = provider_terms(provider)
+                self._docs[doc_id] = (group, provider, terms, lengths)
+                doc_ids.append(doc_id)
+                for specialty in provider_specialties(provider):
+                    self._specialties.setdefault(specialty, set()).add(doc_id)
+                for i, length in enumerate(lengths):
+                    self._field_lengths[i] += length
+                for token in terms:
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        postings = self._postings[token] = set()
+                        bisect.insort(self._vocab, token)
+                        if self._vocabulary is not None:
+                            self._vocabulary.add(token)
+                    postings.add(doc_id)
+            self._groups[group] = (providers, doc_ids)
+
+    def remove(self, group):
+        with self._lock:
+            self._idf_cache.clear()
+            _, doc_ids = self._groups.pop(group, (None, ()))
+            for doc_id in doc_ids:
+                _, provider, terms, lengths = self._docs.pop(doc_id)
+                for specialty in provider_specialties(provider):
+                    postings = self._specialties[specialty]
+                    postings.discard(doc_id)
+                    if not postings:
+                        del self._specialties[specialty]
+                for i, length in enumerate(lengths):
+                    self._field_lengths[i] -= length
+                for token in terms:
+                    postings = self._postings.get(token)
+                    if postings is None:
+                        continue
+                    postings.discard(doc_id)
+                    if not postings:
+                        del self._postings[token]
+                        del self._vocab[bisect.bisect_left(self._vocab, token)]
+                        if self._vocabulary is not None:
+                            self._vocabulary.discard(token)
+
+    def covers(self, group, providers):
+        """True if `providers` is the list currently indexed for `group`"""
+        with self._lock:
+            indexed = self._groups.get(group)
+            return indexed is not None and indexed[0] is providers
+
+    def _prefix_postings(self, prefix):
+        matched = set()
+        start = bisect.bisect_left(self._vocab, prefix)
+        for token in itertools.islice(self._vocab, start, None):
+            if not token.startswith(prefix):
+                break
+            matched |= self._postings[token]
+        return matched
+
+    def _candidate_ids(self, per_word, groups):
+        """Doc ids with a token starting with some query word of MIN_PARTIAL_WORD
+        or more characters, or with tokens starting with every query word.
+        """
+        if not per_word:
+            if groups is None:
+                return set(self._docs)
+            doc_ids = set()
+            for group in groups:
+                doc_ids.update(self._groups.get(group, (None, ()))[1])
+            return doc_ids
+        
+        doc_ids = set()
+        for word, postings in per_word.items():
+            if len(word) >= MIN_PARTIAL_WORD:
+                doc_ids |= postings
+        # Whole-query matches can come from short words alone
+        doc_ids |= set.intersection(*sorted(per_word.values(), key=len))
+        if groups is not None:
+            doc_ids = {d for d in doc_ids if self._docs[d][0] in groups}
+        return doc_ids
+
+    def candidates(self, words, groups=None):
+        """Providers that could match the query `words` (see tokenize), in indexing order,
+        optionally limited to `groups`.
+        """
+        groups = None if groups is None else set(groups)
+        with self._lock:
+            per_word = {word: self._prefix_postings(word) for word in set(words)}
+            doc_ids = self._candidate_ids(per_word, groups)
+            return [self._docs[doc_id][1] for doc_id in sorted(doc_ids)]
+
+    def _bm25(self, terms, lengths, idf):
+        """BM25F score of one document's terms for query words with the given idf"""
+        doc_count = max(len(self._docs), 1)
+        score = 0.0
+        for word, word_idf in idf.items():
+            weighted_tf = 0.0
+            for token, counts in terms.items():
+                if not token.startswith(word):
+                    continue
+                for i, field in enumerate(INDEXED_FIELDS):
+                    if counts[i]:
+                        average = max(self._field_lengths[i] / doc_count, 1e-9)
+                        norm = 1 - BM25_B + BM25_B * lengths[i] / average
+                        weighted_tf += BM25_FIELD_WEIGHTS[field] * counts[i] / norm
+            if weighted_tf:
+                score += word_idf * weighted_tf / (BM25_K1 + weighted_tf)
+        return score
+
+    def _idf(self, per_word):
+        doc_count = len(self._docs)
+        return {word: math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for word, postings in per_word.items()}
+
+    def search(self, words, groups=None):
+        """(provider, BM25F score) for every candidate, in indexing order"""
+        groups = None if groups is None else set(groups)
+        with self._lock:
+            per_word = {word: self._prefix_postings(word) for word in set(words)}
+            idf = self._idf(per_word)
+            results = []
+            for doc_id in sorted(self._candidate_ids(per_word, groups)):
+                _, provider, terms, lengths = self._docs[doc_id]
+                results.append((provider, self._bm25(terms, lengths, idf)))
+            return results
+
+    def score(self, providers, words):
+        """BM25F scores of providers that are not indexed, using the index's statistics.
+        The query's idf is computed once and cached until the index changes.
+        """
+        key = tuple(sorted(set(words)))
+        documents = [provider_terms(provider) for provider in providers]
+        with self._lock:
+            idf = self._idf_cache.get(key)
+            if idf is None:
+                if len(self._idf_cache) >= IDF_CACHE_SIZE:
+                    self._idf_cache.clear()
+                per_word = {word: self._prefix_postings(word) for word in key}
+                idf = self._idf_cache[key] = self._idf(per_word)
+            return [self._bm25(terms, lengths, idf) for terms, lengths in documents]
+
+    def with_specialties(self, terms, groups):
+        """Providers of `groups` (in that order) with a specialty containing any of the lowercase `terms`.
+        Only the distinct specialty names are compared, not every provider.
+        """
+        with self._lock:
+            doc_ids = set()
+            for specialty, postings in self._specialties.items():
+                if any(term in specialty for term in terms):
+                    doc_ids |= postings
+            position = {group: i for i, group in enumerate(groups)}
+            chosen = sorted((position[self._docs[doc_id][0]], doc_id) for doc_id in doc_ids
+                            if self._docs[doc_id][0] in position)
+            return [self._docs[doc_id][1] for _, doc_id in chosen]
+
+    def stats(self):
+        with self._lock:
+            doc_count = max(len(self._docs), 1)
+            return {
+                'groups': len(self._groups),
+                'providers': len(self._docs),
+                'tokens': len(self._postings),
+                'specialties': len(self._specialties),
+                'postings': sum(len(p) for p in self._postings.values()),
+                'average_field_lengths': {field: round(self._field_lengths[i] / doc_count, 2)
+                                          for i, field in enumerate(INDEXED_FIELDS)}
+            }
+
+# Typo tolerance: query words missing from the vocabulary are corrected to a close known word
+FUZZY_MIN_WORD = 4  # shorter words are never corrected
+FUZZY_LONG_WORD = 10  # words this long may be 2 edits away, shorter ones 1
+FUZZY_MAX_CANDIDATES = 64  # vocabulary words verified per lookup, most shared trigrams first
+FUZZY_CACHE_SIZE = 1024  # recent lookups kept until the vocabulary changes
+# Everyday query words, known so they are not "corrected" into provider names
+COMMON_QUERY_WORDS = ['have', 'with', 'from', 'that', 'this', 'been', 'since', 'after', 'when',
+                      'what', 'where', 'which', 'need', 'want', 'find', 'near', 'some', 'very',
+                      'really', 'about', 'like', 'does', 'days', 'weeks', 'month', 'months',
+                      'today', 'yesterday', 'night', 'morning', 'left', 'right', 'side', 'also',
+                      'much', 'more', 'best', 'good', 'open', 'nearby', 'accepts', 'takes']
+# Ordinary English and medical words that are never corrected (see the file's header)
+DICTIONARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'dictionary.txt')
+
+def load_dictionary(path=DICTIONARY_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return frozenset(word for line in f if not line.startswith('#') for word in tokenize(line))
+    except FileNotFoundError:
+        logger.warning(f"Dictionary not found at {path}; only indexed words are protected from correction")
+        return frozenset()
+
+def word_stems(word):
+    """`word` and what it may be an inflection of ("pains" -> "pain", "tried" -> "try")"""
+    stems = [word]
+    for suffix, replacements in (('ies', ('y',)), ('ied', ('y',)), ('es', ('', 'e')), ('s', ('',)),
+                                 ('ed', ('', 'e')), ('ing', ('', 'e')), ('ly', ('',))):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3 and not word.endswith('ss'):
+            stems += [word[:-len(suffix)] + replacement for replacement in replacements]
+    return stems
+
+def trigrams(word):
+    padded = f'${word}$'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (a transposition is one edit), or limit + 1 if above `limit`"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1 and
+                    a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+class FuzzyIndex:
+    """Trigram index over the search vocabulary, for correcting misspelled query words.
+
+    Words are reference counted, so provider tokens (added and discarded by
+    ProviderIndex as providers come and go) and word groups (knowledge base
+    terms, insurer names) can share entries. A lookup only counts trigrams
+    in the postings of the word's rarest trigrams: a word within k edits
+    shares at least one of any 3k + 1 of them. At most FUZZY_MAX_CANDIDATES
+    of those, plus words with the same letters (transpositions), are then
+    checked with a bounded edit distance, so a lookup costs about the same
+    on a large vocabulary as on a small one.
+
+    Words of `dictionary`, and their inflections, count as correctly spelled
+    but are never offered as corrections.
+    """
+
+    def __init__(self, dictionary=frozenset()):
+        self._lock = threading.RLock()
+        self._dictionary = dictionary
+        self._counts = {}  # word -> references
+        self._groups = {}  # group -> words
+        self._trigrams = {}  # trigram -> words
+        self._anagrams = {}  # sorted letters -> words, for transpositions in short words
+        self._vocab = []  # sorted words, for prefix checks
+        self._cache = {}
+
+    def add(self, word):
+        with self._lock:
+            count = self._counts.get(word, 0)
+            self._counts[word] = count + 1
+            if count:
+                return
+            bisect.insort(self._vocab, word)
+            for gram in trigrams(word):
+                self._trigrams.setdefault(gram, set()).add(word)
+            self._anagrams.setdefault(''.join(sorted(word)), set()).add(word)
+            self._cache.clear()
+
+    def discard(self, word):
+        with self._lock:
+            count = self._counts.get(word)
+            if count is None:
+                return
+            if count > 1:
+                self._counts[word] = count - 1
+                return
+            del self._counts[word]
+            del self._vocab[bisect.bisect_left(self._vocab, word)]
+            for gram in trigrams(word):
+                words = self._trigrams[gram]
+                words.discard(word)
+                if not words:
+                    del self._trigrams[gram]
+            letters = ''.join(sorted(word))
+            self._anagrams[letters].discard(word)
+            if not self._anagrams[letters]:
+                del self._anagrams[letters]
+            self._cache.clear()
+
+    def replace(self, group, words):
+        """Make `words` the vocabulary contributed by `group`"""
+        words = set(words)
+        with self._lock:
+            previous = self._groups.get(group, set())
+            for word in words - previous:
+                self.add(word)
+            for word in previous - words:
+                self.discard(word)
+            if words:
+                self._groups[group] = words
+            else:
+                self._groups.pop(group, None)
+
+    def remove(self, group):
+        self.replace(group, ())
+
+    def known(self, word):
+        """True if `word` (or what it is an inflection of) is a vocabulary or dictionary word,
+        or `word` starts a vocabulary word
+        """
+        with self._lock:
+            if any(stem in self._dictionary or stem in self._counts for stem in word_stems(word)):
+                return True
+            i = bisect.bisect_left(self._vocab, word)
+            return i < len(self._vocab) and self._vocab[i].startswith(word)
+
+    def lookup(self, word):
+        """The closest vocabulary word within the edit limit for its length, or None"""
+        with self._lock:
+            if word in self._cache:
+                return self._cache[word]
+            match = self._lookup(word)
+            if len(self._cache) >= FUZZY_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[word] = match
+            return match
+
+    def _lookup(self, word):
+        limit = 2 if len(word) >= FUZZY_LONG_WORD else 1
+        grams = trigrams(word)
+        postings = sorted((self._trigrams.get(gram, ()) for gram in grams), key=len)
+        shared = {}
+        for words in postings[:3 * limit + 1]:
+            for candidate in words:
+                if abs(len(candidate) - len(word)) <= limit and len(candidate) >= FUZZY_MIN_WORD:
+                    shared[candidate] = 0
+        for candidate in shared:
+            shared[candidate] = len(grams & trigrams(candidate))
+        # Each insertion, deletion or substitution changes at most three trigrams
+        minimum = len(grams) - 3 * limit
+        candidates = [c for c, count in shared.items() if count >= minimum]
+        candidates = heapq.nlargest(FUZZY_MAX_CANDIDATES, candidates, key=lambda c: (shared[c], c))
+        # A transposition can change four, so same-letter words are always checked
+        candidates += self._anagrams.get(''.join(sorted(word)), ())
+        best = None
+        for candidate in candidates:
+            distance = edit_distance(word, candidate, limit)
+            if distance > limit:
+                continue
+            rank = (distance, -self._counts[candidate], candidate)
+            if best is None or rank < best:
+                best = rank
+        return best[2] if best else None
+
+    def correct(self, words):
+        """{word: correction} for the words that are unknown but close to a known word"""
+        corrections = {}
+        for word in words:
+            if len(word) < FUZZY_MIN_WORD or word.isdigit() or word in corrections or self.known(word):
+                continue
+            match = self.lookup(word)
+            if match:
+                corrections[word] = match
+        return corrections
+
+    def stats(self):
+        with self._lock:
+            return {
+                'words': len(self._counts),
+                'dictionary_words': len(self._dictionary),
+                'groups': len(self._groups),
+                'trigrams': len(self._trigrams),
+                'cached_lookups': len(self._cache)
+            }
+
+# Search box typeahead (/suggest)
+SUGGEST_LIMIT = 8  # default completions per request
+SUGGEST_MAX_LIMIT = 10
+SUGGEST_BUFFER = 40  # completions kept per prefix, so removals can be patched in place
+SUGGEST_PRECOMPUTED = 2  # prefixes this short are kept up to date as suggestions change
+SUGGEST_SCAN_LIMIT = 256  # longer prefixes matching more keys are kept up to date too
+SUGGEST_CACHE_SIZE = 20000  # longer prefixes whose completions are kept, least recently used dropped first
+SUGGESTION_KINDS = ('provider', 'insurance', 'symptom', 'specialty')
+
+def suggestion_text(text):
+    return ' '.join(tokenize(text))
+
+def word_suffixes(text):
+    """`text` from each of its words on"""
+    return [text[i:] for i in range(len(text)) if i == 0 or text[i - 1] == ' ']
+
+class PrefixCompletions:
+    """The best ranks of the suggestions under one prefix, sorted.
+    If `complete` they are all of them; otherwise every suggestion left out ranks below the last one.
+    """
+    __slots__ = ('ranks', 'members', 'complete')
+
+    def __init__(self, ranks, complete):
+        self.ranks = ranks
+        self.members = {rank[3:]: rank for rank in ranks}
+        self.complete = complete
+
+    def update(self, key, rank):
+        """Patch in the new best rank of suggestion `key` (None once it is gone).
+        Returns False if too few ranks are left to answer a lookup.
+        """
+        bound = None if self.complete or not self.ranks else self.ranks[-1]
+        old = self.members.pop(key, None)
+        if old is not None:
+            del self.ranks[bisect.bisect_left(self.ranks, old)]
+        # Suggestions left out rank below the bound, so only a rank above it is known to belong here
+        if rank is not None and (bound is None or rank <= bound):
+            bisect.insort(self.ranks, rank)
+            self.members[key] = rank
+            if len(self.ranks) > SUGGEST_BUFFER:
+                del self.members[self.ranks.pop()[3:]]
+                self.complete = False
+        return self.complete or len(self.ranks) >= SUGGEST_MAX_LIMIT
+
+class SuggestionIndex:
+    """Sorted-array typeahead over provider names, insurers, symptoms and specialties.
+
+    Every suggestion is stored once per word it contains (the text from that
+    word on), so "card" completes "Miami Cardiology Center" as well as
+    "Cardiology". Keys are kept in sorted buckets by their first
+    SUGGEST_PRECOMPUTED characters. Like FuzzyIndex, suggestions come in
+    groups that are replaced as cache entries change. Popularity is how many
+    providers or locations carry a suggestion plus how often it was searched for.
+
+    The best SUGGEST_BUFFER completions of each prefix are kept: always for
+    prefixes of up to SUGGEST_PRECOMPUTED characters and for heavy ones,
+    matching more than SUGGEST_SCAN_LIMIT keys, and for the rest once they
+    are looked up. A suggestion that is added, removed or changes popularity
+    is patched into them in place. The spare ranks beyond SUGGEST_MAX_LIMIT
+    absorb removals, so a prefix is only recomputed once most of them are
+    gone. A heavy prefix is computed by merging the completions of its
+    one-character-longer prefixes, so a lookup never ranks more than
+    SUGGEST_SCAN_LIMIT keys.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}  # (text, kind) -> [display text, references, searches]
+        self._groups = {}  # group -> {(text, kind): (display text, count)}
+        self._buckets = {}  # first SUGGEST_PRECOMPUTED characters -> sorted (suffix, text, kind)
+        self._precomputed = {}  # short or heavy prefix -> PrefixCompletions
+        self._cache = OrderedDict()  # longer prefix -> PrefixCompletions, least recently used first
+        self._bulk = False  # keys are sorted and completions computed once the bulk load ends
+
+    def _heavy(self, prefix):
+        """Whether `prefix` is kept up to date: it is short or matches more than SUGGEST_SCAN_LIMIT keys"""
+        if len(prefix) <= SUGGEST_PRECOMPUTED:
+            return True
+        _, lo, hi = self._range(prefix)
+        return hi - lo > SUGGEST_SCAN_LIMIT
+
+    def _patch(self, key, removed=False):
+        """Patch the completions of every prefix of `key`'s words after it was added,
+        removed (`removed` once its keys are gone) or changed popularity
+        """
+        if self._bulk:
+            return
+        exists = key in self._entries
+        best = {}
+        heavy = set()
+        for suffix in word_suffixes(key[0]):
+            rank = self._rank(suffix, *key) if exists else None
+            checking = True
+            for i in range(1, len(suffix) + 1):
+                prefix = suffix[:i]
+                if prefix not in best or (rank is not None and rank < best[prefix]):
+                    best[prefix] = rank
+                # Longer prefixes match fewer keys, so checking stops at the first light one.
+                # Only removing keys makes a heavy prefix light.
+                if checking and prefix not in heavy:
+                    checking = (prefix in self._precomputed and not removed) or self._heavy(prefix)
+                    if checking:
+                        heavy.add(prefix)
+        rebuild = []
+        for prefix, rank in best.items():
+            completions = self._precomputed.get(prefix)
+            if completions is None:
+                completions = self._cache.get(prefix)
+                if completions is None:
+                    if prefix not in heavy:
+                        continue
+                    if len(prefix) > SUGGEST_PRECOMPUTED:
+                        # It just grew heavy and is built once every longer prefix is patched
+                        rebuild.append(prefix)
+                        continue
+                    # Short prefixes always have completions, so this is the first suggestion under it
+                    completions = PrefixCompletions([], True)
+                if prefix in heavy:
+                    self._precomputed[prefix] = completions
+                    self._cache.pop(prefix, None)
+            elif prefix not in heavy:
+                # Down to few enough keys to scan, so it is only kept while it is looked up
+                del self._precomputed[prefix]
+                self._cache[prefix] = completions
+            if not completions.update(key, rank):
+                rebuild.append(prefix)
+            elif completions.complete and not completions.ranks and prefix in self._precomputed:
+                del self._precomputed[prefix]
+        # Longer prefixes first, since shorter ones are built from them
+        for prefix in sorted(rebuild, key=len, reverse=True):
+            if prefix in heavy:
+                self._precomputed[prefix] = self._build(prefix)
+            else:
+                self._cache.pop(prefix, None)
+        while len(self._cache) > SUGGEST_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _add(self, key, display, count):
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = [display, count, 0]
+            for suffix in word_suffixes(key[0]) if not self._bulk else ():
+                bisect.insort(self._buckets.setdefault(suffix[:SUGGEST_PRECOMPUTED], []), (suffix, *key))
+        else:
+            entry[1] += count
+        self._patch(key)
+
+    def _discard(self, key, count):
+        entry = self._entries[key]
+        entry[1] -= count
+        removed = entry[1] <= 0
+        if removed:
+            del self._entries[key]
+            for suffix in word_suffixes(key[0]) if not self._bulk else ():
+                bucket = self._buckets[suffix[:SUGGEST_PRECOMPUTED]]
+                del bucket[bisect.bisect_left(bucket, (suffix, *key))]
+                if not bucket:
+                    del self._buckets[suffix[:SUGGEST_PRECOMPUTED]]
+        self._patch(key, removed)
+
+    def replace(self, group, suggestions):
+        """Make (display text, kind) pairs in `suggestions` the ones contributed by `group`"""
+        counts = {}
+        for display, kind in suggestions:
+            text = suggestion_text(display)
+            if text:
+                previous = counts.get((text, kind))
+                counts[(text, kind)] = (display, previous[1] + 1 if previous else 1)
+        with self._lock:
+            # Only the difference is applied, so a re-scrape of the same names changes nothing
+            previous = self._groups.pop(group, {})
+            for key, (_, count) in previous.items():
+                remaining = counts.get(key, (None, 0))[1]
+                if remaining < count:
+                    self._discard(key, count - remaining)
+            for key, (display, count) in counts.items():
+                before = previous.get(key, (None, 0))[1]
+                if count > before:
+                    self._add(key, display, count - before)
+            if counts:
+                self._groups[group] = counts
+
+    def remove(self, group):
+        self.replace(group, ())
+
+    @contextmanager
+    def bulk(self):
+        """Apply many replace() calls, sorting the keys and computing prefix completions
+        once at the end instead of for every suggestion. Lookups wait until it is done.
+        """
+        with self._lock:
+            self._bulk = True
+            try:
+                yield self
+            finally:
+                self._bulk = False
+                self._rebuild()
+
+    def _heavy_prefixes(self, bucket, prefix, lo, hi, found):
+        """Add the longer prefixes of `prefix` matching more than SUGGEST_SCAN_LIMIT of bucket[lo:hi] to `found`"""
+        i = lo
+        while i < hi:
+            suffix = bucket[i][0]
+            if len(suffix) == len(prefix):
+                i += 1
+                continue
+            child = suffix[:len(prefix) + 1]
+            end = bisect.bisect_left(bucket, (child + '\U0010ffff',), i, hi)
+            if end - i > SUGGEST_SCAN_LIMIT:
+                found.append(child)
+                self._heavy_prefixes(bucket, child, i, end, found)
+            i = end
+
+    def _rebuild(self):
+        """Sort the keys and compute the completions of every short and heavy prefix from scratch"""
+        keys = sorted((suffix, *key) for key in self._entries for suffix in word_suffixes(key[0]))
+        self._buckets = {}
+        for key in keys:
+            self._buckets.setdefault(key[0][:SUGGEST_PRECOMPUTED], []).append(key)
+        self._precomputed = {}
+        self._cache.clear()
+        prefixes = {name[:1] for name in self._buckets}
+        for name, bucket in self._buckets.items():
+            if len(name) == SUGGEST_PRECOMPUTED:
+                prefixes.add(name)
+                found = []
+                self._heavy_prefixes(bucket, name, 0, len(bucket), found)
+                prefixes.update(found)
+        # Longer prefixes first, since shorter ones are built from them
+        for prefix in sorted(prefixes, key=len, reverse=True):
+            self._precomputed[prefix] = self._build(prefix)
+
+    def note_search(self, query):
+        """Count a search for a query that is itself a suggestion"""
+        text = suggestion_text(query)
+        with self._lock:
+            for kind in SUGGESTION_KINDS:
+                entry = self._entries.get((text, kind))
+                if entry is not None:
+                    entry[2] += 1
+                    self._patch((text, kind))
+
+    def _range(self, prefix):
+        """(bucket, lo, hi) of the keys starting with `prefix`, which is at least SUGGEST_PRECOMPUTED long"""
+        bucket = self._buckets.get(prefix[:SUGGEST_PRECOMPUTED], [])
+        return (bucket, bisect.bisect_left(bucket, (prefix,)),
+                bisect.bisect_left(bucket, (prefix + '\U0010ffff',)))
+
+    def _keys(self, prefix):
+        """Every key starting with `prefix`"""
+        if len(prefix) < SUGGEST_PRECOMPUTED:
+            return [key for name, bucket in self._buckets.items() if name.startswith(prefix) for key in bucket]
+        bucket, lo, hi = self._range(prefix)
+        return bucket[lo:hi]
+
+    def _rank(self, suffix, text, kind):
+        _, references, searches = self._entries[(text, kind)]
+        # Most popular first; completions of the whole text before ones starting mid-name, then shorter
+        return (-(references + searches), suffix != text, len(text), text, kind)
+
+    def _build(self, prefix):
+        """Compute the completions of `prefix`, merging the completions of longer prefixes
+        where a prefix matches too many keys to rank them all
+        """
+        ranks = {}
+        cutoff = None  # ranks below the last one of a partial child are not known to be complete
+
+        def keep(rank):
+            key = rank[3:]
+            if rank < ranks.get(key, (0,)):
+                ranks[key] = rank
+
+        def merge(child):
+            nonlocal cutoff
+            completions = self._completions(child)
+            for rank in completions.ranks:
+                keep(rank)
+            if not completions.complete and (cutoff is None or completions.ranks[-1] < cutoff):
+                cutoff = completions.ranks[-1]
+
+        if len(prefix) < SUGGEST_PRECOMPUTED:
+            for name, bucket in self._buckets.items():
+                if not name.startswith(prefix):
+                    continue
+                if len(name) == len(prefix):
+                    for key in bucket:
+                        keep(self._rank(*key))
+                else:
+                    merge(name)
+        else:
+            bucket, lo, hi = self._range(prefix)
+            if hi - lo <= SUGGEST_SCAN_LIMIT:
+                for key in bucket[lo:hi]:
+                    keep(self._rank(*key))
+            else:
+                # A suggestion in the overall top is in the top of the longer prefix holding its best key
+                i = lo
+                while i < hi:
+                    suffix = bucket[i][0]
+                    if len(suffix) == len(prefix):
+                        keep(self._rank(*bucket[i]))
+                        i += 1
+                        continue
+                    child = suffix[:len(prefix) + 1]
+                    merge(child)
+                    i = self._range(child)[2]
+
+        top = sorted(rank for rank in ranks.values() if cutoff is None or rank <= cutoff)
+        complete = cutoff is None and len(top) <= SUGGEST_BUFFER
+        if not complete and len(top) < SUGGEST_MAX_LIMIT:
+            # Partial children left too little to go on: rank every key
+            ranks = {}
+            for key in self._keys(prefix):
+                keep(self._rank(*key))
+            top = sorted(ranks.values())
+            complete = len(top) <= SUGGEST_BUFFER
+        return PrefixCompletions(top[:SUGGEST_BUFFER], complete)
+
+    def _completions(self, prefix):
+        completions = self._precomputed.get(prefix)
+        if completions is not None:
+            return completions
+        if len(prefix) <= SUGGEST_PRECOMPUTED:
+            return PrefixCompletions([], True)
+        completions = self._cache.get(prefix)
+        if completions is not None:
+            self._cache.move_to_end(prefix)
+            return completions
+        completions = self._cache[prefix] = self._build(prefix)
+        if len(self._cache) > SUGGEST_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return completions
+
+    def suggest(self, prefix, limit=SUGGEST_LIMIT):
+        """Up to `limit` completions of `prefix`, most popular first"""
+        text = suggestion_text(prefix)
+        if not text:
+            return []
+        # A trailing space means the last word is complete
+        if prefix[-1:].isspace():
+            text += ' '
+        with self._lock:
+            return [{
+                'text': self._entries[(name, kind)][0],
+                'kind': kind,
+                'popularity': -popularity
+            } for popularity, _, _, name, kind in self._completions(text).ranks[:limit]]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'suggestions': len(self._entries),
+                'keys': sum(len(bucket) for bucket in self._buckets.values()),
+                'groups': len(self._groups),
+                'precomputed_prefixes': len(self._precomputed),
+                'cached_prefixes': len(self._cache)
+            }
+
+# Provider distances are measured from the user's shared position
+SPATIAL_CELL_DEGREES = 0.1  # grid cell size of the spatial index (about 11 km north-south)
+NEARBY_RADIUS_KM = 40  # default /nearby-providers radius
+NEARBY_MAX_RADIUS_KM = 200
+NEARBY_LIMIT = 20
+ORIGIN_DECIMALS = 2  # user positions are rounded to about 1 km, so searches from nearby share cached results
+
+def provider_coordinates(provider):
+    """(latitude, longitude) of a provider, or None if it has no usable coordinates"""
+    try:
+        latitude, longitude = float(provider['latitude']), float(provider['longitude'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if math.isnan(latitude) or math.isnan(longitude):
+        return None
+    return latitude, longitude
+
+def valid_coordinates(latitude, longitude):
+    """Whether a position is on the globe (never for NaN or infinities)"""
+    return -90 <= latitude <= 90 and -180 <= longitude <= 180
+
+def provider_distances(providers, origin):
+    """Miles from `origin` to each provider (None where either has no coordinates)"""
+    if origin is None or not providers:
+        return [None] * len(providers)
+    coordinates = [provider_coordinates(provider) or (np.nan, np.nan) for provider in providers]
+    lats, lons = np.array(coordinates, dtype=np.float64).T
+    miles = np.round(haversine_km_array(origin[0], origin[1], lats, lons) / KM_PER_MILE, 1)
+    return [None if math.isnan(distance) else float(distance) for distance in miles]
+
+class SpatialIndex:
+    """Uniform grid over provider coordinates for "nearest N within R km" lookups.
+
+    Providers are indexed in the same groups as ProviderIndex and replaced as
+    cache entries change. A lookup visits grid rings outward from the origin
+    and stops once the next ring is farther than the radius, or than the
+    N-th nearest provider found so far, so it only measures providers near
+    the origin rather than every provider.
+    """
+
+    def __init__(self, cell_degrees=SPATIAL_CELL_DEGREES):
+        self._lock = threading.RLock()
+        self._cell_degrees = cell_degrees
+        self._ids = itertools.count()
+        self._cells = {}  # (row, column) -> {entry id: (group, provider, latitude, longitude)}
+        self._groups = {}  # group -> [(cell, entry id)]
+
+    def _cell(self, latitude, longitude):
+        return (math.floor(latitude / self._cell_degrees), math.floor(longitude / self._cell_degrees))
+
+    def replace(self, group, providers):
+        """Index the providers of `group` that have coordinates, dropping what it held before"""
+        with self._lock:
+            self.remove(group)
+            entries = []
+            for provider in providers or ():
+                coordinates = provider_coordinates(provider) if is_provider(provider) else None
+                if coordinates is None:
+                    continue
+                cell = self._cell(*coordinates)
+                entry_id = next(self._ids)
+                self._cells.setdefault(cell, {})[entry_id] = (group, provider, *coordinates)
+                entries.append((cell, entry_id))
+            if entries:
+                self._groups[group] = entries
+
+    def remove(self, group):
+        with self._lock:
+            for cell, entry_id in self._groups.pop(group, ()):
+                bucket = self._cells[cell]
+                del bucket[entry_id]
+                if not bucket:
+                    del self._cells[cell]
+
+    def _ring(self, row, column, ring, max_rows):
+        """Cells `ring` cells out from (row, column), leaving out rows more than `max_rows` away"""
+        if ring == 0:
+            return [(row, column)]
+        cells = []
+        if ring <= max_rows:
+            cells += [(row + dr, column + dc) for dr in (-ring, ring) for dc in range(-ring, ring + 1)]
+        rows = min(ring - 1, max_rows)
+        cells += [(row + dr, column + dc) for dc in (-ring, ring) for dr in range(-rows, rows + 1)]
+        return cells
+
+    def nearest(self, latitude, longitude, radius_km, limit, groups=None):
+        """Up to `limit` (provider, km) within `radius_km`, nearest first"""
+        groups = None if groups is None else set(groups)
+        # Narrowest cell width anywhere within the radius (east-west cells shrink away from the equator)
+        widest_latitude = min(abs(latitude) + radius_km / (EARTH_RADIUS_KM * math.pi / 180), 89.0)
+        row_km = self._cell_degrees * EARTH_RADIUS_KM * math.pi / 180
+        cell_km = row_km * math.cos(math.radians(widest_latitude))
+        # Cells more than this many rows or rings out are all farther than the radius
+        max_rows = math.ceil(radius_km / row_km) + 1
+        max_ring = min(math.ceil(radius_km / cell_km) + 1, math.ceil(180 / self._cell_degrees))
+        row, column = self._cell(latitude, longitude)
+        nearest = []  # max-heap of (-km, entry id, provider)
+        with self._lock:
+            for ring in range(max_ring + 1):
+                # Everything in this ring is at least ring - 1 whole cells away
+                closest = (ring - 1) * cell_km
+                if closest > radius_km or (len(nearest) >= limit and closest > -nearest[0][0]):
+                    break
+                for cell in self._ring(row, column, ring, max_rows):
+                    for entry_id, (group, provider, lat, lon) in self._cells.get(cell, {}).items():
+                        if groups is not None and group not in groups:
+                            continue
+                        km = haversine_km(latitude, longitude, lat, lon)
+                        if km > radius_km:
+                            continue
+                        if len(nearest) < limit:
+                            heapq.heappush(nearest, (-km, entry_id, provider))
+                        elif km < -nearest[0][0]:
+                            heapq.heapreplace(nearest, (-km, entry_id, provider))
+        return [(provider, -negative_km) for negative_km, _, provider in sorted(nearest, reverse=True)]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'groups': len(self._groups),
+                'providers': sum(len(entries) for entries in self._groups.values()),
+                'cells': len(self._cells)
+            }
+
+fuzzy_index = FuzzyIndex(dictionary=load_dictionary())
+suggestion_index = SuggestionIndex()
+spatial_index = SpatialIndex()
+provider_index = ProviderIndex(vocabulary=fuzzy_index)
+
+class DataVersions:
+    """Change counters for the data search results are computed from.
+
+    'providers' and 'reviews' are bumped by the code that changes them;
+    'medical' is bumped whenever a medical_db section is replaced or resized.
+    Providers are also versioned per location key, so results for one
+    location survive scrapes of the others.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {'providers': 0, 'reviews': 0, 'medical': 0}
+        self._locations = {}  # location key -> 'providers' count when its providers last changed
+        self._medical_fingerprint = None
+
+    def bump(self, name, location=None):
+        """Count a change; `location` is the key whose providers changed"""
+        with self._lock:
+            self._versions[name] += 1
+            if location is not None:
+                # Stamped from the overall count, so a location's version never repeats
+                self._locations[location] = self._versions[name]
+
+    def _check_medical(self):
+        # Caller holds self._lock
+        fingerprint = tuple((section, id(value), len(value)) for section, value in medical_db.items())
+        if fingerprint != self._medical_fingerprint:
+            if self._medical_fingerprint is not None:
+                self._versions['medical'] += 1
+            self._medical_fingerprint = fingerprint
+
+    def get(self, name):
+        with self._lock:
+            if name == 'medical':
+                self._check_medical()
+            return self._versions[name]
+
+    def snapshot(self, location=None):
+        """All versions; with a location key, providers are versioned by that location only"""
+        with self._lock:
+            self._check_medical()
+            versions = dict(self._versions)
+            if location is not None:
+                versions['providers'] = (location, self._locations.get(location, 0))
+            return tuple(sorted(versions.items()))
+
+data_versions = DataVersions()
+
+def on_provider_cache_change(provider_type):
+    def changed(key, providers):
+        data_versions.bump('providers', key)
+        names = [provider.get('name', '') for provider in providers or () if is_provider(provider)]
+        if provider_type == 'healthcare':
+            provider_index.replace(('healthcare', key), providers)
+            spatial_index.replace(('healthcare', key), providers)
+            suggestion_index.replace(('healthcare', key), [(name, 'provider') for name in names])
+        else:
+            fuzzy_index.replace(('insurance', key), tokenize(' '.join(names)))
+            suggestion_index.replace(('insurance', key), [(name, 'insurance') for name in names])
+    return changed
+
+# Cache for scraped data, one entry per (provider_type, location key)
 scraped_cache = {
-    'healthcare': {},
-    'insurance': {},
-    'last_update': None
+    'healthcare': TTLCache(PROVIDER_CACHE_MAX_ENTRIES, CACHE_EXPIRATION, on_change=on_provider_cache_change('healthcare')),
+    'insurance': TTLCache(PROVIDER_CACHE_MAX_ENTRIES, CACHE_EXPIRATION, on_change=on_provider_cache_change('insurance'))
 }
 
-# Live scraping progress tracking
+# On-disk copy of the provider cache so scraped locations survive restarts
+PROVIDER_DB_PATH = os.environ.get('PROVIDER_DB_PATH',
+                                  os.path.join(os.path.dirname(os.path.abspath(__file__)), 'provider_cache.db'))
+PERSIST_PROVIDER_CACHE = True
+FALLBACK_SOURCE = 'Local Database'  # `source` of the generated providers served when scraping fails
+
+def is_fallback_data(providers):
+    """Whether a provider list is generated fallback data rather than a scrape"""
+    return bool(providers) and all(provider.get('source') == FALLBACK_SOURCE for provider in providers)
+
+class ProviderStore:
+    """SQLite (WAL) store of scraped providers, one row per (provider_type, location).
+
+    Rows keep their scrape timestamp, so entries warm-loaded at startup
+    expire on the same schedule they would have in memory. The database file
+    is only created by the first write, so reads of a missing file find nothing.
+    Only successful scrapes are saved; fallback rows written by older versions
+    are never loaded.
+    """
+
+    def __init__(self, path=PROVIDER_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self, create):
+        """The open connection (caller holds the lock); None if the file is missing and not `create`"""
+        if self._conn is None and (create or os.path.exists(self.path)):
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS providers (
+                    provider_type TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    providers TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (provider_type, location)
+                )
+            """)
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_providers_updated ON providers (updated_at)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def save_many(self, rows):
+        """Write (provider_type, location, providers, updated_at) rows in one transaction"""
+        with self._lock:
+            conn = self._connect(create=True)
+            with conn:
+                conn.executemany(
+                    'INSERT OR REPLACE INTO providers (provider_type, location, providers, updated_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    [(t, loc, json.dumps(providers), updated_at) for t, loc, providers, updated_at in rows]
+                )
+
+    def load(self, provider_type, location):
+        """Return (providers, updated_at) for one location, or None"""
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return None
+            row = conn.execute(
+                'SELECT providers, updated_at FROM providers WHERE provider_type = ? AND location = ?',
+                (provider_type, location)
+            ).fetchone()
+        if row is None:
+            return None
+        providers = json.loads(row[0])
+        return None if is_fallback_data(providers) else (providers, row[1])
+
+    def load_recent(self, provider_type, limit):
+        """Return the `limit` most recently scraped (location, providers, updated_at) rows"""
+        with self._lock:
+            conn = self._connect(create=False)
+            if conn is None:
+                return []
+            rows = conn.execute(
+                'SELECT location, providers, updated_at FROM providers WHERE provider_type = ? '
+                'ORDER BY updated_at DESC LIMIT ?',
+                (provider_type, limit)
+            ).fetchall()
+        rows = [(location, json.loads(providers), updated_at) for location, providers, updated_at in rows]
+        return [row for row in rows if not is_fallback_data(row[1])]
+
+def open_provider_store():
+    if not PERSIST_PROVIDER_CACHE:
+        return None
+    return ProviderStore(PROVIDER_DB_PATH)
+
+def warm_provider_cache():
+    """Load the most recently scraped locations from disk into memory"""
+    if provider_store is None:
+        return 0
+    start = time.time()
+    loaded = 0
+    try:
+        # Typeahead completions are computed once for everything loaded
+        with suggestion_index.bulk():
+            for provider_type, cache in scraped_cache.items():
+                # Oldest first so the newest end up most recently used
+                for location, providers, updated_at in reversed(provider_store.load_recent(provider_type, cache.max_entries)):
+                    cache.set(location, provider_records(providers), updated_at=updated_at)
+                    loaded += 1
+    except sqlite3.Error as e:
+        logger.error(f"Error warming provider cache: {str(e)}")
+    logger.info(f"Warm-loaded {loaded} cached provider lists from disk in {time.time() - start:.3f}s")
+    return loaded
+
+provider_store = open_provider_store()
+warm_provider_cache()
+
+# Live scraping progress tracking; finished entries expire, running ones are never evicted
 scraping_progress = {
-    'healthcare': {},
-    'insurance': {}
+    'healthcare': TTLCache(PROGRESS_CACHE_MAX_ENTRIES, CACHE_EXPIRATION, serve_stale=False, pin=is_scraping),
+    'insurance': TTLCache(PROGRESS_CACHE_MAX_ENTRIES, CACHE_EXPIRATION, serve_stale=False, pin=is_scraping)
 }
 
-# Cache expiration time (2 hours)
-CACHE_EXPIRATION = 7200  # seconds
+# Serve expired/missing cache entries immediately and refresh them in the background
+STALE_WHILE_REVALIDATE = True
+
+# Freshness of provider data served for a request, ordered best to worst
+FRESHNESS_LEVELS = ['fresh', 'stale', 'fallback']
+
+# Scrape scheduler settings
+SCRAPE_WORKERS = 2  # concurrent location scrapes
+SCRAPE_JOB_HISTORY = 100  # finished jobs kept for /scrape-jobs
+PRIORITY_INTERACTIVE = 0  # user is watching live progress
+PRIORITY_BLOCKING = 5  # a request is waiting on the result
+PRIORITY_COLD_MISS = 7  # a user is being shown fallback data until the scrape lands
+PRIORITY_BACKGROUND = 10  # stale-while-revalidate refresh
+SCRAPE_RETRY_DELAY = 300  # seconds before a location whose scrape failed is refreshed again
+
+# Runs the healthcare and insurance scrapers for a location side by side
+source_executor = ThreadPoolExecutor(max_workers=SCRAPE_WORKERS * 2, thread_name_prefix='scrape-source')
+
+# Serializes writes that replace a location's providers
+cache_write_lock = threading.Lock()
 
 # Store location data in memory (replace with database in production)
 user_locations = {}
 
+def request_origin(location=None):
+    """(latitude, longitude) to measure distances from: the requesting user's shared
+    position, else the centre of `location`, else None
+    """
+    if has_request_context():
+        position = user_locations.get(request.remote_addr)
+        if position is not None:
+            return (round(float(position['latitude']), ORIGIN_DECIMALS),
+                    round(float(position['longitude']), ORIGIN_DECIMALS))
+    if location:
+        place = canonicalize_location(location)
+        if place.latitude is not None:
+            return place.latitude, place.longitude
+    return None
+
 # Store reviews in memory (replace with database in production)
 reviews_db = {
     'healthcare': [],
@@ -197,238 +2035,891 @@ except FileNotFoundError:
             "pregnancy": "OB-GYN",
             "pregnant": "OB-GYN",
             "gynecology": "OB-GYN"
+        },
+        # Specialties that treat each condition; unlisted conditions go to General Practice
+        "condition_specialties": {
+            # Heart and circulation
+            "Heart Attack": ["Cardiology"],
+            "Heart Disease": ["Cardiology"],
+            "Angina": ["Cardiology"],
+            "Hypertension": ["General Practice", "Cardiology"],
+            "Low Blood Pressure": ["General Practice", "Cardiology"],
+            "Costochondritis": ["General Practice"],
+            
+            # Respiratory
+            "Asthma": ["General Practice", "Pulmonology"],
+            "Pneumonia": ["General Practice", "Pulmonology"],
+            "Bronchitis": ["General Practice", "Pulmonology"],
+            "Sleep Apnea": ["Pulmonology"],
+            "Sinusitis": ["General Practice", "ENT"],
+            "Strep Throat": ["General Practice"],
+            "Tonsillitis": ["General Practice", "ENT"],
+            "Inner Ear Infection": ["General Practice", "ENT"],
+            
+            # Digestive
+            "Gastroenteritis": ["General Practice", "Gastroenterology"],
+            "Gastritis": ["Gastroenterology"],
+            "Ulcer": ["Gastroenterology"],
+            "IBS": ["Gastroenterology"],
+            "Crohn's Disease": ["Gastroenterology"],
+            "Appendicitis": ["General Practice"],
+            
+            # Skin
+            "Eczema": ["Dermatology"],
+            "Psoriasis": ["Dermatology"],
+            "Dermatitis": ["Dermatology"],
+            "Dry Skin": ["Dermatology"],
+            
+            # Mental health
+            "Anxiety": ["Psychiatry"],
+            "Anxiety Disorder": ["Psychiatry"],
+            "Panic Disorder": ["Psychiatry"],
+            "Depression": ["Psychiatry"],
+            "Major Depression": ["Psychiatry"],
+            "Bipolar Disorder": ["Psychiatry"],
+            "PTSD": ["Psychiatry"],
+            "Stress": ["Psychiatry"],
+            "Burnout": ["Psychiatry"],
+            "Insomnia": ["General Practice", "Psychiatry"],
+            
+            # Neurological
+            "Migraine": ["General Practice", "Neurology"],
+            "Tension Headache": ["General Practice"],
+            "Stroke": ["Neurology"],
+            "Dementia": ["Neurology"],
+            "Multiple Sclerosis": ["Neurology"],
+            "Neuropathy": ["Neurology"],
+            "Pinched Nerve": ["Neurology", "Orthopedics"],
+            "Vertigo": ["General Practice", "ENT"],
+            
+            # Bones, joints and muscles
+            "Arthritis": ["Rheumatology", "Orthopedics"],
+            "Gout": ["Rheumatology"],
+            "Lupus": ["Rheumatology"],
+            "Herniated Disc": ["Orthopedics"],
+            "Muscle Strain": ["General Practice", "Orthopedics"],
+            "Injury": ["General Practice", "Orthopedics"],
+            
+            # Hormones, kidneys and pregnancy
+            "Diabetes": ["General Practice", "Endocrinology"],
+            "Hypothyroidism": ["Endocrinology"],
+            "Hypoglycemia": ["General Practice", "Endocrinology"],
+            "Kidney Disease": ["Nephrology"],
+            "Kidney Stones": ["Urology"],
+            "Pregnancy": ["OB-GYN"],
+            "Menopause": ["OB-GYN"]
         }
     }
 
+_clinics_index_version = None
+_clinic_records = []
+
+def refresh_clinic_index():
+    """Re-index medical_db['clinics'] (search, typeahead and location) if the knowledge base changed since it was indexed"""
+    global _clinics_index_version, _clinic_records
+    version = data_versions.get('medical')
+    if version != _clinics_index_version:
+        clinics = _clinic_records = provider_records(medical_db.get('clinics', []))
+        provider_index.replace(CLINICS_GROUP, clinics)
+        spatial_index.replace(CLINICS_GROUP, clinics)
+        suggestion_index.replace(CLINICS_GROUP, [(clinic.get('name', ''), 'provider') for clinic in clinics] +
+                                 [(specialty, 'specialty') for clinic in clinics
+                                  for specialty in clinic.get('specialties', [])])
+        _clinics_index_version = version
+
+refresh_clinic_index()
+
+def clinic_records():
+    """medical_db['clinics'] as ProviderRecords"""
+    refresh_clinic_index()
+    return _clinic_records
+
+@app.after_request
+def add_freshness_header(response):
+    """Tell clients whether provider data came from a fresh, stale or fallback cache entry"""
+    if 'data_freshness' in g:
+        response.headers['X-Data-Freshness'] = g.data_freshness
+    return response
+
 @app.route('/')
 def home():
     return render_template('index.html')
 
-@app.route('/search', methods=['POST'])
-def search():
-    """Unified search across clinics, insurance, and symptoms.
-    Enhanced with intelligent query classification and better matching.
+# /search paging: results are ranked once, cached, and served a page at a time
+SEARCH_PAGE_SIZE = 10  # default `limit`
+SEARCH_MAX_PAGE_SIZE = 50
+SEARCH_MAX_RESULTS = 200  # ranked results kept per search for paging
+SEARCH_SNAPSHOT_MAX_ENTRIES = 1000  # ranked result lists kept for their cursors
+SEARCH_SNAPSHOT_TTL = 1800  # seconds a cursor stays valid
+
+# Cache of whole /search responses
+SEARCH_CACHE_MAX_ENTRIES = 1000
+SEARCH_CACHE_TTL = 300  # seconds
+
+class SearchResultCache:
+    """Bounded TTL cache of /search results keyed on (query, type, location key, origin).
+
+    Each result is stored with the data versions it was computed from and
+    is discarded on lookup once reviews or medical_db change, or the
+    providers of its location (of any location, for searches without one).
     """
-    query = request.json.get('query', '')
-    search_type = request.json.get('type', 'all')
-    location = request.json.get('location', None)
 
+    def __init__(self, max_entries=SEARCH_CACHE_MAX_ENTRIES, ttl=SEARCH_CACHE_TTL):
+        self._cache = TTLCache(max_entries, ttl, serve_stale=False)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(query, search_type, location, origin=None):
+        return (' '.join(str(query).lower().split()), search_type,
+                location_key(location) if location else None, origin)
+
+    def get(self, key):
+        versions = data_versions.snapshot(key[2])
+        entry = self._cache.get(key)
+        with self._lock:
+            if entry is not None and entry[0] != versions:
+                self._cache.pop(key)
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, versions, results):
+        """Store results computed from the data at `versions` (taken before computing them)"""
+        self._cache.set(key, (versions, results))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._cache),
+                'max_entries': self._cache.max_entries,
+                'ttl': self._cache.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+                'miss_ratio': round(self.misses / lookups, 3) if lookups else None,
+                'data_versions': dict(data_versions.snapshot())
+            }
+
+search_result_cache = SearchResultCache()
+
+# Request coalescing settings
+COALESCE_HISTORY = 100  # recent leaders kept for /coalescing-stats
+
+class Flight:
+    """One in-flight computation and the requests waiting on it"""
+
+    __slots__ = ('done', 'result', 'error', 'followers', 'started_at')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+        self.started_at = time.time()
+
+class SingleFlight:
+    """Coalesces concurrent identical requests onto one computation.
+
+    The first caller for a key (the leader) runs the work; callers that
+    arrive while it is running (followers) wait and share its result, or
+    its exception. Keys start with the route name.
+    """
+
+    def __init__(self, history=COALESCE_HISTORY):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._history = deque(maxlen=history)
+        self._totals = {}
+
+    def do(self, key, compute):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Flight()
+            else:
+                flight.followers += 1
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        
+        try:
+            flight.result = compute()
+            return flight.result
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+                totals = self._totals.setdefault(key[0], {'leaders': 0, 'followers': 0, 'max_followers': 0})
+                totals['leaders'] += 1
+                totals['followers'] += flight.followers
+                totals['max_followers'] = max(totals['max_followers'], flight.followers)
+                self._history.append({
+                    'route': key[0],
+                    'key': list(key[1:]),
+                    'followers': flight.followers,
+                    'duration': round(time.time() - flight.started_at, 3),
+                    'failed': flight.error is not None
+                })
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._flights),
+                'routes': {route: dict(totals) for route, totals in self._totals.items()},
+                'recent': list(reversed(self._history))
+            }
+
+request_coalescer = SingleFlight()
+
+def run_search(query, search_type, location, origin=None):
+    """Compute a /search response body; clinic distances are measured from `origin`"""
     results = {
-        'clinics': [],
+        'clinics': ClinicMatches(),
         'insurance': [],
         'medical_advice': None,
         'error': None
     }
+    
+    # Tokens, synonyms, keyword matches, intent and symptoms are derived once per request
+    analysis = QueryAnalysis(query)
+    
+    # Detect query intent if type is 'all'
+    if search_type == 'all':
+        intent = detect_query_intent(analysis)
+        logger.info(f"Detected query intent: {intent} for query: '{query}'")
+        
+        if intent == 'symptom':
+            results['medical_advice'] = analyze_symptoms(analysis)
+            with analysis.timed('clinics'):
+                results['clinics'] = search_clinics_by_specialty(analysis, location)
+        elif intent == 'insurance':
+            with analysis.timed('insurance'):
+                results['insurance'] = search_insurance(analysis, location)
+        elif intent == 'clinic':
+            with analysis.timed('clinics'):
+                results['clinics'] = search_clinics(analysis, location)
+        else:
+            # Mixed or unclear - search everything
+            with analysis.timed('clinics'):
+                results['clinics'] = search_clinics(analysis, location)
+            with analysis.timed('insurance'):
+                results['insurance'] = search_insurance(analysis, location)
+            symptoms_result = analyze_symptoms(analysis)
+            if symptoms_result['possible_conditions']:
+                results['medical_advice'] = symptoms_result
+    else:
+        # Explicit type specified
+        if search_type in ['all', 'clinics']:
+            with analysis.timed('clinics'):
+                results['clinics'] = search_clinics(analysis, location)
+
+        if search_type in ['all', 'insurance']:
+            with analysis.timed('insurance'):
+                results['insurance'] = search_insurance(analysis, location)
+
+        if search_type in ['all', 'symptoms']:
+            results['medical_advice'] = analyze_symptoms(analysis)
+    
+    # Rank and limit results
+    with analysis.timed('rank'):
+        matches = results['clinics']
+        distances = provider_distances(matches.providers, origin)
+        order = rank_clinic_order(matches.providers, limit=SEARCH_MAX_RESULTS, distances=distances,
+                                  relevance=matches.relevance)
+        results['clinics'] = matches.rows(order, [distances[i] for i in order])
+        results['insurance'] = rank_insurance_results(results['insurance'], limit=SEARCH_MAX_RESULTS)
+    results['freshness'] = g.get('data_freshness', 'fresh')
+    results['corrections'] = analysis.corrections
+    results['timings'] = analysis.timings
+    results['result_id'] = next(search_result_ids)
+    return results
+
+search_result_ids = itertools.count(1)
+
+# Ranked results by result_id, for their cursors. Unlike search_result_cache this is not
+# cleared when data changes, so a search keeps paging through the results it started with.
+search_snapshots = TTLCache(SEARCH_SNAPSHOT_MAX_ENTRIES, SEARCH_SNAPSHOT_TTL, serve_stale=False)
+
+def encode_search_cursor(result_id, offset):
+    payload = json.dumps({'r': result_id, 'o': offset}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
 
+def decode_search_cursor(cursor):
+    """Return (result_id, offset), or raise ValueError for a malformed cursor"""
     try:
-        # Detect query intent if type is 'all'
-        if search_type == 'all':
-            intent = detect_query_intent(query)
-            logger.info(f"Detected query intent: {intent} for query: '{query}'")
-            
-            if intent == 'symptom':
-                results['medical_advice'] = analyze_symptoms(query)
-                results['clinics'] = search_clinics_by_specialty(query, location)
-            elif intent == 'insurance':
-                results['insurance'] = search_insurance(query, location)
-            elif intent == 'clinic':
-                results['clinics'] = search_clinics(query, location)
-            else:
-                # Mixed or unclear - search everything
-                results['clinics'] = search_clinics(query, location)
-                results['insurance'] = search_insurance(query, location)
-                symptoms_result = analyze_symptoms(query)
-                if symptoms_result['possible_conditions']:
-                    results['medical_advice'] = symptoms_result
-        else:
-            # Explicit type specified
-            if search_type in ['all', 'clinics']:
-                results['clinics'] = search_clinics(query, location)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        result_id, offset = int(payload['r']), int(payload['o'])
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if offset < 0:
+        raise ValueError('Invalid cursor')
+    return result_id, offset
 
-            if search_type in ['all', 'insurance']:
-                results['insurance'] = search_insurance(query, location)
+def search_page(results, offset, limit):
+    """One page of ranked clinics and insurance, with the cursor for the next page"""
+    end = offset + limit
+    has_more = end < len(results['clinics']) or end < len(results['insurance'])
+    page = {k: v for k, v in results.items() if k != 'result_id'}
+    page['clinics'] = results['clinics'][offset:end]
+    page['insurance'] = results['insurance'][offset:end]
+    page['total'] = {'clinics': len(results['clinics']), 'insurance': len(results['insurance'])}
+    page['next_cursor'] = encode_search_cursor(results['result_id'], end) if has_more else None
+    return page
 
-            if search_type in ['all', 'symptoms']:
-                results['medical_advice'] = analyze_symptoms(query)
-        
-        # Rank and limit results
-        results['clinics'] = rank_clinic_results(results['clinics'])[:10]
-        results['insurance'] = results['insurance'][:10]
+@app.route('/search', methods=['POST'])
+def search():
+    """Unified search across clinics, insurance, and symptoms.
+    Enhanced with intelligent query classification and better matching.
+    """
+    query = request.json.get('query', '')
+    search_type = request.json.get('type', 'all')
+    location = request.json.get('location', None)
+    cursor = request.json.get('cursor')
+    
+    try:
+        limit = min(max(int(request.json.get('limit', SEARCH_PAGE_SIZE)), 1), SEARCH_MAX_PAGE_SIZE)
+        result_id, offset = decode_search_cursor(cursor) if cursor else (None, 0)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+
+    if cursor is None:
+        suggestion_index.note_search(query)
 
-        return jsonify(results)
+    try:
+        if result_id is not None:
+            # Later pages come from the snapshot the first page was served from
+            snapshot = search_snapshots.get(result_id)
+            if snapshot is None:
+                return jsonify({'error': 'Cursor expired; restart the search'}), 410
+            note_freshness(snapshot['freshness'])
+            return jsonify(dict(search_page(snapshot, offset, limit), cached=True))
+        
+        # Popular queries are answered from the result cache until their data changes
+        origin = request_origin(location)
+        cache_key = SearchResultCache.key(query, search_type, location, origin)
+        cached = search_result_cache.get(cache_key)
+        if cached is not None:
+            search_snapshots.set(cached['result_id'], cached)
+            note_freshness(cached['freshness'])
+            return jsonify(dict(search_page(cached, offset, limit), cached=True))
+        
+        def compute():
+            versions = data_versions.snapshot(cache_key[2])
+            results = run_search(query, search_type, location, origin)
+            search_result_cache.set(cache_key, versions, results)
+            return results
+        
+        # Identical searches arriving together share one computation
+        results = request_coalescer.do(('search',) + cache_key, compute)
+        search_snapshots.set(results['result_id'], results)
+        note_freshness(results['freshness'])
+        return jsonify(dict(search_page(results, offset, limit), cached=False))
     except Exception as e:
         logger.error(f"Search failure: {str(e)}")
         return jsonify({'error': 'Search failed'}), 500
 
-def scrape_healthcare_providers(location, live_update=False):
-    """Scrape healthcare provider data from multiple sources"""
+@app.route('/suggest', methods=['GET'])
+def suggest():
+    """Typeahead completions for the search box, most popular first"""
+    query = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', SUGGEST_LIMIT)), 1), SUGGEST_MAX_LIMIT)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    # Keeps the knowledge base and local clinics current
+    keyword_matcher()
+    refresh_clinic_index()
+    return jsonify({'query': query, 'suggestions': suggestion_index.suggest(query, limit)})
+
+# Server-Sent Events settings for live scraping progress
+SSE_BUFFER_SIZE = 200  # events buffered per subscriber before it is resynced
+SSE_HEARTBEAT = 15  # seconds between keep-alive comments
+SSE_MAX_STREAM = 600  # seconds before a stream is closed (clients reconnect)
+
+class ProgressSubscriber:
+    """One SSE client's bounded event buffer"""
+
+    def __init__(self, key, buffer_size):
+        self.key = key
+        self.events = Queue(maxsize=buffer_size)
+        self.overflowed = False
+
+    def push(self, event):
+        try:
+            self.events.put_nowait(event)
+        except Exception:
+            # Slow client: drop the backlog and send a full snapshot instead
+            self.overflowed = True
+            while True:
+                try:
+                    self.events.get_nowait()
+                except Empty:
+                    break
+
+    def next(self, timeout):
+        try:
+            return self.events.get(timeout=timeout)
+        except Empty:
+            return None
+
+class ProgressBroker:
+    """Fans out scraping progress events to subscribers of a location"""
+
+    def __init__(self, buffer_size=SSE_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, location):
+        subscriber = ProgressSubscriber(location_key(location), self.buffer_size)
+        with self._lock:
+            self._subscribers.setdefault(subscriber.key, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(subscriber.key, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(subscriber.key, None)
+
+    def publish(self, location, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(location_key(location), ()))
+        for subscriber in subscribers:
+            subscriber.push((event, data))
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+progress_broker = ProgressBroker()
+
+def start_progress(provider_type, location, total, status='scraping'):
+    """Begin live progress tracking for a scrape"""
+    scraping_progress[provider_type][location_key(location)] = {
+        'status': status,
+        'providers': [],
+        'progress': 0,
+        'total': total
+    }
+    progress_broker.publish(location, 'status', {
+        'type': provider_type, 'status': status, 'progress': 0, 'total': total
+    })
+
+def update_progress(provider_type, location, provider=None, **fields):
+    """Record live scrape progress and push only what changed to stream subscribers"""
+    entry = scraping_progress[provider_type].get(location_key(location))
+    if entry is None:
+        return
+    if provider is not None:
+        entry['providers'].append(provider)
+    entry.update(fields)
+    
+    if provider is not None:
+        progress_broker.publish(location, 'provider', {
+            'type': provider_type, 'provider': provider,
+            'progress': entry['progress'], 'total': entry['total']
+        })
+    fields.pop('progress', None)
+    if fields:
+        event = {'type': provider_type, 'status': entry['status'],
+                 'progress': entry['progress'], 'total': entry['total']}
+        if 'providers' in fields:
+            event['providers'] = entry['providers']
+        progress_broker.publish(location, 'status', event)
+
+PHONE_PATTERN = re.compile(r'^(\+?1[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{4}$')
+MAPS_COORDS_PATTERN = re.compile(r'!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)')
+HOURS_PREFIXES = ('open', 'closed', 'closes', 'opens')
+
+def parse_maps_feed(html, limit=MAPS_RESULT_LIMIT):
+    """Parse every Google Maps result card in a scrolled feed's page source.
+    Fields a card does not expose are left as None so callers can fill them from the detail pane.
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    cards = []
+    
+    for card in soup.select('div.Nv2PK')[:limit]:
+        link = card.select_one('a.hfpxzc')
+        place_url = link.get('href') if link else None
+        
+        # Name
+        name_elem = card.select_one('div.qBF1Pd') or card.select_one('.fontHeadlineSmall')
+        if name_elem:
+            name = name_elem.get_text(strip=True)
+        else:
+            name = link.get('aria-label') if link else None
+        
+        # Rating and review count
+        rating = None
+        rating_elem = card.select_one('span.MW4etd')
+        if rating_elem:
+            try:
+                rating = float(rating_elem.get_text(strip=True).replace(',', '.'))
+            except ValueError:
+                pass
+        review_count = None
+        reviews_elem = card.select_one('span.UY7F9')
+        if reviews_elem:
+            digits = re.sub(r'\D', '', reviews_elem.get_text())
+            review_count = int(digits) if digits else None
+        
+        # Website button
+        website_elem = card.select_one('a[data-value="Website"]')
+        website = website_elem.get('href') if website_elem else None
+        
+        # Category, address and phone share the "·"-separated info rows
+        category = address = None
+        phone_elem = card.select_one('span.UsdlK')
+        phone = phone_elem.get_text(strip=True) if phone_elem else None
+        for row in (r for r in card.select('div.W4Efsd') if not r.select_one('div.W4Efsd')):
+            parts = [p.strip() for p in row.get_text(' ').split('·')]
+            for part in (p for p in parts if p):
+                if PHONE_PATTERN.match(part):
+                    phone = phone or part
+                elif part.lower().startswith(HOURS_PREFIXES):
+                    continue
+                elif category is None and not re.search(r'\d', part):
+                    category = part
+                elif address is None and re.search(r'\d', part) and re.search(r'[A-Za-z]', part):
+                    address = part
+        
+        # Coordinates are embedded in the place link
+        latitude = longitude = None
+        coords = MAPS_COORDS_PATTERN.search(place_url or '')
+        if coords:
+            latitude, longitude = float(coords.group(1)), float(coords.group(2))
+        
+        cards.append({
+            'name': name,
+            'address': address,
+            'phone': phone,
+            'website': website,
+            'rating': rating,
+            'review_count': review_count,
+            'category': category,
+            'place_url': place_url,
+            'latitude': latitude,
+            'longitude': longitude
+        })
+    
+    return cards
+
+def read_place_details(driver, item):
+    """Click a result card and read the fields shown in its detail pane"""
+    headers = driver.find_elements(By.CSS_SELECTOR, 'h1.DUwDvf')
+    previous_name = headers[0].text if headers else ''
+    item.click()
+    wait_for(driver, 'maps', 'detail', header_text_changed('h1.DUwDvf', previous_name))
+    
+    details = {}
+    try:
+        details['name'] = driver.find_element(By.CSS_SELECTOR, 'h1.DUwDvf').text
+    except Exception:
+        pass
+    try:
+        details['address'] = driver.find_element(By.CSS_SELECTOR, 'button[data-item-id="address"]').text
+    except Exception:
+        pass
+    try:
+        phone_element = driver.find_element(By.CSS_SELECTOR, 'button[data-item-id^="phone"]')
+        details['phone'] = phone_element.get_attribute('aria-label').replace('Phone: ', '')
+    except Exception:
+        pass
+    try:
+        website_element = driver.find_element(By.CSS_SELECTOR, 'a[data-item-id="authority"]')
+        details['website'] = website_element.get_attribute('href')
+    except Exception:
+        pass
+    try:
+        rating_text = driver.find_element(By.CSS_SELECTOR, 'div.F7nice span[aria-hidden="true"]').text
+        details['rating'] = float(rating_text.split()[0])
+    except Exception:
+        pass
+    
+    return details
+
+def build_maps_provider(card, idx, location):
+    """Turn a parsed Google Maps card into a provider record, filling gaps with placeholders.
+    Distances are not stored: they depend on who is asking (see provider_distances).
+    """
+    return {
+        "name": card.get('name') or f"Healthcare Provider {idx + 1}",
+        "location": location,
+        "address": card.get('address') or f"{location}, FL",
+        "phone": card.get('phone') or "(305) 555-" + str(1000 + idx).zfill(4),
+        "website": card.get('website') or card.get('place_url') or f"https://healthcare-{idx}.com",
+        "rating": card.get('rating'),
+        "review_count": card.get('review_count'),
+        "category": card.get('category'),
+        "latitude": card.get('latitude'),
+        "longitude": card.get('longitude'),
+        "source": "Google Maps"
+    }
+
+def enable_replay(fixtures_dir=None, latency=None):
+    """Run the scrapers against recorded fixtures: a ReplayDriver stands in for Chrome
+    and a local ReplayServer stands in for the insurance search page.
+    Returns the started server.
+    """
+    global INSURANCE_SEARCH_URL
+    from replay import FIXTURES_DIR, ReplayDriver, ReplayServer
+    
+    fixtures_dir = fixtures_dir or FIXTURES_DIR
+    server = ReplayServer(fixtures_dir, latency=latency).start()
+    INSURANCE_SEARCH_URL = server.url + '/search?q={query}'
+    driver_pool.driver_factory = lambda: ReplayDriver(fixtures_dir, latency=latency)
+    logger.info(f"Replaying recorded scraper fixtures from {fixtures_dir} (search stand-in at {server.url})")
+    return server
+
+class ScrapeError(Exception):
+    """A scrape that failed; `providers` is the fallback data shown in its place"""
+
+    def __init__(self, message, providers):
+        super().__init__(message)
+        self.providers = providers
+
+def scrape_healthcare_providers(location, live_update=False, driver=None):
+    """Scrape healthcare provider data from multiple sources.
+    Pass `driver` to reuse an already checked-out browser; otherwise one is borrowed from `driver_pool`.
+    Raises ScrapeError if the scrape fails.
+    """
     providers = []
-    driver = None
+    owns_driver = driver is None
+    failed = False
     
     # Initialize progress tracking for live updates
     if live_update:
-        scraping_progress['healthcare'][location] = {
-            'status': 'scraping',
-            'providers': [],
-            'progress': 0,
-            'total': 15
-        }
+        start_progress('healthcare', location, total=MAPS_RESULT_LIMIT)
     
     try:
         logger.info(f"Starting healthcare provider scraping for {location}")
         
-        # Initialize the webdriver
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        driver.set_page_load_timeout(30)
+        # Borrow a webdriver from the pool
+        if owns_driver:
+            driver = driver_pool.checkout()
         
         # Scrape from Google Maps - Updated selectors
         search_query = f"hospitals+clinics+doctors+{location.replace(' ', '+')}"
-        maps_url = f"https://www.google.com/maps/search/{search_query}"
+        maps_url = MAPS_SEARCH_URL.format(query=search_query)
         driver.get(maps_url)
         
         # Wait for results to load
-        time.sleep(5)
+        scrollable_div = wait_for(driver, 'maps', 'feed',
+                                  EC.presence_of_element_located((By.CSS_SELECTOR, 'div[role="feed"]')))
         
         try:
-            # Scroll to load more results
-            scrollable_div = driver.find_element(By.CSS_SELECTOR, 'div[role="feed"]')
-            for _ in range(3):
+            # Scroll until the feed holds enough results or stops growing
+            for _ in range(MAPS_MAX_SCROLLS if scrollable_div else 0):
+                if len(driver.find_elements(By.CSS_SELECTOR, 'div.Nv2PK')) >= MAPS_RESULT_LIMIT:
+                    break
+                height = driver.execute_script('return arguments[0].scrollHeight', scrollable_div)
                 driver.execute_script('arguments[0].scrollTop = arguments[0].scrollHeight', scrollable_div)
-                time.sleep(2)
+                if not wait_for(driver, 'maps', 'scroll', scroll_height_changed(scrollable_div, height)):
+                    break
         except Exception as e:
             logger.warning(f"Could not scroll results: {str(e)}")
         
         # Extract provider information using updated selectors
-        result_items = driver.find_elements(By.CSS_SELECTOR, 'div.Nv2PK')
+        result_items = driver.find_elements(By.CSS_SELECTOR, 'div.Nv2PK')[:MAPS_RESULT_LIMIT]
         
-        logger.info(f"Found {len(result_items)} potential providers")
+        # Read every result card from one snapshot of the feed
+        if MAPS_BULK_EXTRACTION:
+            cards = parse_maps_feed(driver.page_source, limit=MAPS_RESULT_LIMIT)
+        else:
+            cards = [{} for _ in result_items]
+        
+        logger.info(f"Found {len(cards)} potential providers")
         
-        if live_update and location in scraping_progress['healthcare']:
-            scraping_progress['healthcare'][location]['total'] = min(len(result_items), 15)
+        if live_update:
+            update_progress('healthcare', location, total=len(cards))
         
-        for idx, item in enumerate(result_items[:15]):  # Limit to first 15 results
+        detail_clicks = 0
+        for idx, card in enumerate(cards):
             try:
-                # Click on the item to get details
-                item.click()
-                time.sleep(2)
-                
-                # Extract name
-                try:
-                    name = driver.find_element(By.CSS_SELECTOR, 'h1.DUwDvf').text
-                except:
-                    name = f"Healthcare Provider {idx + 1}"
-                
-                # Extract address
-                try:
-                    address = driver.find_element(By.CSS_SELECTOR, 'button[data-item-id="address"]').text
-                except:
-                    address = f"{location}, FL"
-                
-                # Extract phone
-                try:
-                    phone_element = driver.find_element(By.CSS_SELECTOR, 'button[data-item-id^="phone"]')
-                    phone = phone_element.get_attribute('aria-label').replace('Phone: ', '')
-                except:
-                    phone = "(305) 555-" + str(1000 + idx).zfill(4)
-                
-                # Extract website
-                try:
-                    website_element = driver.find_element(By.CSS_SELECTOR, 'a[data-item-id="authority"]')
-                    website = website_element.get_attribute('href')
-                except:
-                    website = f"https://healthcare-{idx}.com"
-                
-                # Extract rating if available
-                try:
-                    rating_text = driver.find_element(By.CSS_SELECTOR, 'div.F7nice span[aria-hidden="true"]').text
-                    rating = float(rating_text.split()[0])
-                except:
-                    rating = None
+                # Only open the detail pane for fields the card did not expose
+                missing = [field for field in MAPS_DETAIL_FIELDS if not card.get(field)]
+                if missing and idx < len(result_items):
+                    details = read_place_details(driver, result_items[idx])
+                    detail_clicks += 1
+                    for field, value in details.items():
+                        if value and not card.get(field):
+                            card[field] = value
                 
-                # Calculate a mock distance (you can enhance this with real geocoding)
-                import random
-                distance = round(random.uniform(0.5, 25.0), 1)
-                
-                provider_data = {
-                    "name": name,
-                    "location": location,
-                    "address": address,
-                    "phone": phone,
-                    "website": website,
-                    "rating": rating,
-                    "distance": distance,
-                    "source": "Google Maps"
-                }
+                provider_data = build_maps_provider(card, idx, location)
                 
                 providers.append(provider_data)
                 
                 # Live update: add provider to progress tracking
-                if live_update and location in scraping_progress['healthcare']:
-                    scraping_progress['healthcare'][location]['providers'].append(provider_data)
-                    scraping_progress['healthcare'][location]['progress'] = idx + 1
+                if live_update:
+                    update_progress('healthcare', location, provider=provider_data, progress=idx + 1)
                 
-                logger.info(f"Successfully scraped provider: {name}")
+                logger.info(f"Successfully scraped provider: {provider_data['name']}")
                 
             except Exception as e:
                 logger.error(f"Error extracting provider #{idx} data: {str(e)}")
                 continue
         
+        logger.info(f"Opened {detail_clicks} detail panes for {len(cards)} results")
         logger.info(f"Successfully scraped {len(providers)} healthcare providers")
         
         # Mark scraping as complete
-        if live_update and location in scraping_progress['healthcare']:
-            scraping_progress['healthcare'][location]['status'] = 'complete'
+        if live_update:
+            update_progress('healthcare', location, status='complete')
         
     except Exception as e:
         logger.error(f"Error in healthcare provider scraping: {str(e)}")
-        # Return fallback data
+        failed = True
         providers = generate_fallback_healthcare_providers(location)
         
-        # Mark scraping as failed
-        if live_update and location in scraping_progress['healthcare']:
-            scraping_progress['healthcare'][location]['status'] = 'failed'
-            scraping_progress['healthcare'][location]['providers'] = providers
+        # Mark scraping as failed, showing fallback data meanwhile
+        if live_update:
+            update_progress('healthcare', location, status='failed', providers=providers)
+        raise ScrapeError(f"Healthcare scrape for {location} failed: {str(e)}", providers) from e
     
     finally:
-        if driver:
-            driver.quit()
+        if owns_driver and driver:
+            driver_pool.checkin(driver, healthy=not failed or driver_pool.is_healthy(driver))
     
     return providers
 
-def scrape_insurance_providers(location, live_update=False):
-    """Scrape insurance provider data from multiple sources"""
+def random_user_agent():
+    try:
+        return ua.random
+    except Exception:
+        return DEFAULT_USER_AGENT
+
+class HttpFetcher:
+    """Tier 1 fetcher: pooled keep-alive requests.Session with rotating user agents and retries.
+    Only useful for pages that render server-side.
+    """
+    name = 'http'
+
+    def __init__(self, pool_size=HTTP_POOL_SIZE, retries=HTTP_RETRIES, timeout=HTTP_TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def fetch(self, url, driver=None):
+        response = self.session.get(url, timeout=self.timeout, headers={
+            'User-Agent': random_user_agent(),
+            'Accept-Language': 'en-US,en;q=0.9'
+        })
+        response.raise_for_status()
+        return response.text
+
+class BrowserFetcher:
+    """Tier 2 fetcher: render the page in Chrome, reusing `driver` or borrowing one from the pool"""
+    name = 'browser'
+
+    def __init__(self, source, wait_name, ready_selector):
+        self.source = source
+        self.wait_name = wait_name
+        self.ready_selector = ready_selector
+
+    def _render(self, driver, url):
+        driver.get(url)
+        wait_for(driver, self.source, self.wait_name,
+                 EC.presence_of_element_located((By.CSS_SELECTOR, self.ready_selector)))
+        return driver.page_source
+
+    def fetch(self, url, driver=None):
+        if driver is not None:
+            return self._render(driver, url)
+        with driver_pool.driver() as pooled:
+            return self._render(pooled, url)
+
+class TieredFetcher:
+    """Try each fetcher in order, escalating when a page fails to load or parses to nothing"""
+
+    def __init__(self, tiers):
+        self.tiers = tiers
+        self._lock = threading.Lock()
+        self._stats = {tier.name: {'attempts': 0, 'hits': 0, 'empty': 0, 'errors': 0} for tier in tiers}
+
+    def _count(self, tier, outcome):
+        with self._lock:
+            self._stats[tier.name]['attempts'] += 1
+            self._stats[tier.name][outcome] += 1
+
+    def fetch(self, url, parse, driver=None):
+        """Return (parsed results, name of the tier that produced them)"""
+        last_error = None
+        for tier in self.tiers:
+            try:
+                html = tier.fetch(url, driver=driver)
+            except Exception as e:
+                logger.warning(f"{tier.name} fetch of {url} failed: {str(e)}")
+                self._count(tier, 'errors')
+                last_error = e
+                continue
+            
+            parsed = parse(html)
+            if parsed:
+                self._count(tier, 'hits')
+                return parsed, tier.name
+            self._count(tier, 'empty')
+        
+        if last_error is not None:
+            raise last_error
+        return [], None
+
+    def stats(self):
+        with self._lock:
+            return {name: dict(stat) for name, stat in self._stats.items()}
+
+def parse_insurance_results(html):
+    """Find the organic result blocks on a search results page"""
+    soup = BeautifulSoup(html, 'html.parser')
+    return soup.find_all('div', class_='g')
+
+insurance_fetcher = TieredFetcher([
+    HttpFetcher(),
+    BrowserFetcher('search', 'results', 'div#search, div.g')
+])
+
+def scrape_insurance_providers(location, live_update=False, driver=None):
+    """Scrape insurance provider data from multiple sources.
+    The search page is fetched over plain HTTP first; a browser (`driver`, or one borrowed
+    from `driver_pool`) is only used when that page parses to nothing.
+    Raises ScrapeError if the scrape fails.
+    """
     providers = []
-    driver = None
     
     # Initialize progress tracking for live updates
     if live_update:
-        scraping_progress['insurance'][location] = {
-            'status': 'scraping',
-            'providers': [],
-            'progress': 0,
-            'total': 15
-        }
+        start_progress('insurance', location, total=15)
     
     try:
         logger.info(f"Starting insurance provider scraping for {location}")
         
-        # Initialize the webdriver
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        driver.set_page_load_timeout(30)
-        
         # Search for insurance providers
         search_query = f"health+insurance+providers+{location.replace(' ', '+')}"
-        search_url = f"https://www.google.com/search?q={search_query}"
-        driver.get(search_url)
-        time.sleep(3)
-        
-        # Parse with BeautifulSoup
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        search_url = INSURANCE_SEARCH_URL.format(query=search_query)
+        search_results, tier = insurance_fetcher.fetch(search_url, parse_insurance_results, driver=driver)
         
-        # Find search results
-        search_results = soup.find_all('div', class_='g')
-        
-        logger.info(f"Found {len(search_results)} insurance search results")
+        logger.info(f"Found {len(search_results)} insurance search results via {tier or 'no fetcher'}")
         
         # List of major insurance providers to look for
         major_insurers = [
@@ -437,8 +2928,8 @@ def scrape_insurance_providers(location, live_update=False):
             "WellCare", "Florida Blue", "Ambetter", "Oscar Health", "Bright Health"
         ]
         
-        if live_update and location in scraping_progress['insurance']:
-            scraping_progress['insurance'][location]['total'] = min(len(search_results), 15)
+        if live_update:
+            update_progress('insurance', location, total=min(len(search_results), 15))
         
         for idx, result in enumerate(search_results[:15]):
             try:
@@ -479,9 +2970,8 @@ def scrape_insurance_providers(location, live_update=False):
                 providers.append(provider_data)
                 
                 # Live update: add provider to progress tracking
-                if live_update and location in scraping_progress['insurance']:
-                    scraping_progress['insurance'][location]['providers'].append(provider_data)
-                    scraping_progress['insurance'][location]['progress'] = idx + 1
+                if live_update:
+                    update_progress('insurance', location, provider=provider_data, progress=idx + 1)
                 
                 logger.info(f"Successfully scraped insurance provider: {name}")
                 
@@ -506,34 +2996,32 @@ def scrape_insurance_providers(location, live_update=False):
                     providers.append(provider_data)
                     
                     # Live update
-                    if live_update and location in scraping_progress['insurance']:
-                        scraping_progress['insurance'][location]['providers'].append(provider_data)
+                    if live_update:
+                        update_progress('insurance', location, provider=provider_data)
         
         logger.info(f"Successfully scraped {len(providers)} insurance providers")
         
         # Mark scraping as complete
-        if live_update and location in scraping_progress['insurance']:
-            scraping_progress['insurance'][location]['status'] = 'complete'
+        if live_update:
+            update_progress('insurance', location, status='complete')
         
     except Exception as e:
         logger.error(f"Error in insurance provider scraping: {str(e)}")
-        # Return fallback data
         providers = generate_fallback_insurance_providers(location)
         
-        # Mark scraping as failed
-        if live_update and location in scraping_progress['insurance']:
-            scraping_progress['insurance'][location]['status'] = 'failed'
-            scraping_progress['insurance'][location]['providers'] = providers
-    
-    finally:
-        if driver:
-            driver.quit()
+        # Mark scraping as failed, showing fallback data meanwhile
+        if live_update:
+            update_progress('insurance', location, status='failed', providers=providers)
+        raise ScrapeError(f"Insurance scrape for {location} failed: {str(e)}", providers) from e
     
     return providers
 
 def generate_fallback_healthcare_providers(location):
-    """Generate fallback healthcare provider data when scraping fails"""
+    """Generate fallback healthcare provider data when scraping fails.
+    They are placed at the centre of the location, if it is a known place.
+    """
     import random
+    place = canonicalize_location(location)
     
     provider_names = [
         "Memorial Healthcare System", "Baptist Health", "Cleveland Clinic Florida",
@@ -552,8 +3040,9 @@ def generate_fallback_healthcare_providers(location):
             "phone": f"(305) 555-{1000 + idx}",
             "website": f"https://{name.lower().replace(' ', '')}.com",
             "rating": round(random.uniform(3.5, 5.0), 1),
-            "distance": round(random.uniform(0.5, 20.0), 1),
-            "source": "Local Database"
+            "latitude": place.latitude,
+            "longitude": place.longitude,
+            "source": FALLBACK_SOURCE
         })
     
     return providers
@@ -584,266 +3073,925 @@ def generate_fallback_insurance_providers(location):
             "location": location,
             "description": "Health insurance provider serving Florida",
             "website": f"https://{company['name'].lower().replace(' ', '')}.com",
-            "source": "Local Database"
+            "source": FALLBACK_SOURCE
         })
     
     return providers
 
+def store_providers(locations, healthcare_providers, insurance_providers):
+    """Store freshly scraped providers under each location's key, both sources with one timestamp.
+    Writers are serialized by cache_write_lock, but each source is its own cache entry, so a
+    reader can briefly see new healthcare data beside the old insurance data.
+    A source passed as None failed to scrape and keeps whatever the cache already holds.
+    The cache holds ProviderRecords; the batch is also written to the on-disk provider store.
+    """
+    updated_at = time.time()
+    locations = {location_key(location) for location in locations}
+    scraped = {provider_type: providers for provider_type, providers
+               in (('healthcare', healthcare_providers), ('insurance', insurance_providers))
+               if providers is not None}
+    records = {provider_type: provider_records(providers) for provider_type, providers in scraped.items()}
+    with cache_write_lock:
+        for key in locations:
+            for provider_type, provider_list in records.items():
+                scraped_cache[provider_type].set(key, provider_list, updated_at=updated_at)
+    
+    if provider_store is not None and scraped:
+        try:
+            provider_store.save_many(
+                [(provider_type, key, providers, updated_at)
+                 for provider_type, providers in scraped.items() for key in locations]
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error persisting providers: {str(e)}")
+
+def timed_scrape(scraper, location, live_update):
+    """Run a scraper, returning (providers, seconds, error); a failed scrape gives its fallback providers"""
+    start = time.time()
+    try:
+        providers, error = scraper(location, live_update=live_update), None
+    except ScrapeError as e:
+        providers, error = e.providers, str(e)
+    return providers, round(time.time() - start, 3), error
+
+def run_provider_scrape(location, live_update=False):
+    """Scrape both provider types for a location in parallel and store them under its key.
+    Runs on a scrape scheduler worker; use update_provider_cache to request a refresh.
+    Returns the providers for each source, per-source timings in seconds and the
+    errors of sources that failed. Failed sources are not stored: their fallback
+    data is returned only so live progress can show it.
+    """
+    start = time.time()
+    # Each source borrows its own pooled driver
+    healthcare_future = source_executor.submit(timed_scrape, scrape_healthcare_providers, location, live_update)
+    insurance_future = source_executor.submit(timed_scrape, scrape_insurance_providers, location, live_update)
+    healthcare_providers, healthcare_time, healthcare_error = healthcare_future.result()
+    insurance_providers, insurance_time, insurance_error = insurance_future.result()
+    
+    store_providers({location},
+                    healthcare_providers if healthcare_error is None else None,
+                    insurance_providers if insurance_error is None else None)
+    
+    timings = {
+        'healthcare': healthcare_time,
+        'insurance': insurance_time,
+        'total': round(time.time() - start, 3)
+    }
+    logger.info(f"Refreshed {location} in {timings['total']}s "
+                f"(healthcare {healthcare_time}s, insurance {insurance_time}s)")
+    
+    errors = {provider_type: error for provider_type, error
+              in (('healthcare', healthcare_error), ('insurance', insurance_error)) if error is not None}
+    return {
+        'healthcare': healthcare_providers,
+        'insurance': insurance_providers,
+        'timings': timings,
+        'errors': errors
+    }
+
 def update_provider_cache(location, live_update=False):
-    """Update the cache with fresh provider data"""
+    """Update the cache with fresh provider data.
+    Live updates are queued and return immediately; otherwise this waits for the scrape.
+    """
     try:
         if live_update:
-            # Run scraping in background thread for live updates
-            def scrape_in_background():
-                healthcare_providers = scrape_healthcare_providers(location, live_update=True)
-                insurance_providers = scrape_insurance_providers(location, live_update=True)
-                
-                scraped_cache['healthcare'][location] = healthcare_providers
-                scraped_cache['insurance'][location] = insurance_providers
-                scraped_cache['last_update'] = time.time()
-            
-            thread = threading.Thread(target=scrape_in_background)
-            thread.daemon = True
-            thread.start()
+            scrape_scheduler.submit(location, live_update=True, priority=PRIORITY_INTERACTIVE)
             return True
         else:
-            # Run synchronously
-            healthcare_providers = scrape_healthcare_providers(location, live_update=False)
-            insurance_providers = scrape_insurance_providers(location, live_update=False)
-            
-            scraped_cache['healthcare'][location] = healthcare_providers
-            scraped_cache['insurance'][location] = insurance_providers
-            scraped_cache['last_update'] = time.time()
-            
-            return True
+            job, _ = scrape_scheduler.submit(location, priority=PRIORITY_BLOCKING)
+            job.wait()
+            return job.status == 'done'
     except Exception as e:
         logger.error(f"Error updating provider cache: {str(e)}")
         return False
 
-def get_cached_providers(provider_type, location):
-    """Get providers from cache, update if necessary"""
-    current_time = time.time()
+class ScrapeJob:
+    """A queued or running scrape of one location"""
+
+    def __init__(self, job_id, location, key, priority, live_update):
+        self.id = job_id
+        self.location = location
+        self.key = key
+        self.aliases = {location}
+        self.priority = priority
+        self.live_update = live_update
+        self.status = 'queued'
+        self.error = None
+        self.followers = 0
+        self.timings = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'location': self.location,
+            'key': self.key,
+            'aliases': sorted(self.aliases),
+            'priority': self.priority,
+            'live_update': self.live_update,
+            'status': self.status,
+            'error': self.error,
+            'followers': self.followers,
+            'source_timings': self.timings,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'queue_time': round((self.started_at or time.time()) - self.created_at, 3),
+            'run_time': round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None
+        }
+
+class ScrapeScheduler:
+    """Priority job queue drained by a fixed pool of scrape workers.
+
+    Jobs are single-flight per location key: submitting a location
+    that is already queued or running returns the existing job (bumping
+    its priority if needed) instead of starting another Chrome session.
+    """
+
+    def __init__(self, workers=SCRAPE_WORKERS, history=SCRAPE_JOB_HISTORY):
+        self.workers = workers
+        self._queue = PriorityQueue()
+        self._lock = threading.Lock()
+        self._active = {}
+        self._jobs = {}
+        self._history = deque(maxlen=history)
+        self._failed_at = {}
+        self._ids = itertools.count(1)
+        self._seq = itertools.count()
+        self._threads = []
+
+    def _start_workers(self):
+        # Workers start on first use so importing the app stays cheap
+        if self._threads:
+            return
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"scrape-worker-{n}")
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, location, live_update=False, priority=PRIORITY_BACKGROUND):
+        """Queue a scrape, returning (job, created).
+        The job scrapes the location's canonical name; what was asked for is kept in its aliases.
+        A new live job resets the location's progress to 'queued' before any worker can pick it up.
+        """
+        place = canonicalize_location(location)
+        key = place.key
+        with self._lock:
+            self._start_workers()
+            job = self._active.get(key)
+            if job is not None:
+                job.followers += 1
+                job.aliases.add(location)
+                job.live_update = job.live_update or live_update
+                if job.status == 'queued' and priority < job.priority:
+                    job.priority = priority
+                    self._queue.put((priority, next(self._seq), job))
+                return job, False
+            
+            job = ScrapeJob(next(self._ids), place.name, key, priority, live_update)
+            job.aliases.add(location)
+            if live_update:
+                # Clear the previous run's progress so clients do not see it as finished
+                for provider_type in ('healthcare', 'insurance'):
+                    start_progress(provider_type, location, total=0, status='queued')
+            self._active[key] = job
+            self._jobs[job.id] = job
+            self._queue.put((priority, next(self._seq), job))
+            return job, True
+
+    def cancel(self, job_id):
+        """Cancel a queued job; jobs that are already running cannot be interrupted"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != 'queued':
+                return False
+            self._finish(job, 'cancelled')
+        if job.live_update:
+            for provider_type in ('healthcare', 'insurance'):
+                update_progress(provider_type, job.location, status='cancelled')
+        return True
+
+    def _finish(self, job, status, error=None):
+        # Caller holds self._lock
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        if status == 'failed':
+            self._failed_at[job.key] = job.finished_at
+            cutoff = job.finished_at - SCRAPE_RETRY_DELAY
+            self._failed_at = {key: at for key, at in self._failed_at.items() if at > cutoff}
+        elif status == 'done':
+            self._failed_at.pop(job.key, None)
+        if self._active.get(job.key) is job:
+            del self._active[job.key]
+        self._history.append(job)
+        self._jobs = {j.id: j for j in list(self._active.values()) + list(self._history)}
+        job._done.set()
+
+    def _work(self):
+        while True:
+            priority, _, job = self._queue.get()
+            with self._lock:
+                # Skip cancelled jobs and entries superseded by a priority bump
+                if job.status != 'queued' or priority != job.priority:
+                    continue
+                job.status = 'running'
+                job.started_at = time.time()
+                live_at_start = job.live_update
+            
+            status, error = 'done', None
+            try:
+                result = run_provider_scrape(job.location, live_update=live_at_start)
+                job.timings = result['timings']
+                if result['errors']:
+                    status = 'failed'
+                    error = '; '.join(result['errors'].values())
+                if job.live_update and not live_at_start:
+                    # A live subscriber joined mid-scrape; publish the finished result
+                    for provider_type in ('healthcare', 'insurance'):
+                        providers = result[provider_type]
+                        start_progress(provider_type, job.location, total=len(providers))
+                        update_progress(provider_type, job.location,
+                                        status='failed' if provider_type in result['errors'] else 'complete',
+                                        providers=providers, progress=len(providers))
+            except Exception as e:
+                logger.error(f"Scrape job {job.id} for {job.location} failed: {str(e)}")
+                status, error = 'failed', str(e)
+            
+            with self._lock:
+                self._finish(job, status, error)
+            # Only now are the results stored, so progress streams wait for this before they end
+            progress_broker.publish(job.location, 'job', {'id': job.id, 'status': status, 'error': error})
+
+    def get_job(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def is_active(self, location):
+        with self._lock:
+            return location_key(location) in self._active
+
+    def recently_failed(self, location):
+        """Whether the location's last scrape failed less than SCRAPE_RETRY_DELAY seconds ago"""
+        with self._lock:
+            failed_at = self._failed_at.get(location_key(location))
+            return failed_at is not None and time.time() - failed_at < SCRAPE_RETRY_DELAY
+
+    def jobs(self):
+        with self._lock:
+            active = sorted(self._active.values(), key=lambda j: (j.status != 'running', j.priority, j.created_at))
+            return {
+                'workers': self.workers,
+                'queued': sum(1 for j in active if j.status == 'queued'),
+                'running': sum(1 for j in active if j.status == 'running'),
+                'active': [j.to_dict() for j in active],
+                'recent': [j.to_dict() for j in reversed(self._history)]
+            }
+
+scrape_scheduler = ScrapeScheduler()
+
+def refresh_providers_async(location, priority=PRIORITY_BACKGROUND):
+    """Queue a background refresh of a location's providers, at most one per location.
+    A location whose scrape just failed is left alone for SCRAPE_RETRY_DELAY seconds.
+    """
+    if scrape_scheduler.recently_failed(location):
+        return False
+    _, created = scrape_scheduler.submit(location, priority=priority)
+    return created
+
+def note_freshness(freshness):
+    """Record the worst data freshness served during the current request"""
+    if not has_request_context():
+        return
+    current = g.get('data_freshness', 'fresh')
+    if FRESHNESS_LEVELS.index(freshness) > FRESHNESS_LEVELS.index(current):
+        current = freshness
+    g.data_freshness = current
+
+def get_cached_providers_with_freshness(provider_type, location):
+    """Get providers from cache along with a freshness flag ('fresh', 'stale' or 'fallback').
+    In stale-while-revalidate mode this never blocks on a scrape.
+    """
+    place = canonicalize_location(location)
+    entry = scraped_cache[provider_type].get_entry(place.key)
+    
+    # Fall back to the on-disk store for locations evicted from memory
+    if entry is None and provider_store is not None:
+        try:
+            stored = provider_store.load(provider_type, place.key)
+        except sqlite3.Error as e:
+            logger.error(f"Error reading provider store: {str(e)}")
+            stored = None
+        if stored is not None:
+            scraped_cache[provider_type].set(place.key, provider_records(stored[0]), updated_at=stored[1])
+            entry = scraped_cache[provider_type].get_entry(place.key)
+    
+    if entry is not None and not entry.is_expired():
+        return entry.value, 'fresh'
+    
+    if not STALE_WHILE_REVALIDATE:
+        if not scrape_scheduler.recently_failed(location):
+            update_provider_cache(location)
+        entry = scraped_cache[provider_type].get_entry(place.key)
+        if entry is not None and not entry.is_expired():
+            return entry.value, 'fresh'
+    else:
+        # Nothing cached means the user gets fallback data, so that scrape goes ahead of stale refreshes
+        refresh_providers_async(location, PRIORITY_BACKGROUND if entry is not None else PRIORITY_COLD_MISS)
     
-    # Check if cache needs updating
-    if (location not in scraped_cache[provider_type] or 
-        scraped_cache['last_update'] is None or
-        current_time - scraped_cache['last_update'] > CACHE_EXPIRATION):
-        update_provider_cache(location)
+    if entry is not None:
+        return entry.value, 'stale'
     
-    return scraped_cache[provider_type].get(location, [])
+    # Cold miss: answer with fallback data until a scrape succeeds
+    if provider_type == 'healthcare':
+        return provider_records(generate_fallback_healthcare_providers(place.name)), 'fallback'
+    return provider_records(generate_fallback_insurance_providers(place.name)), 'fallback'
 
-def detect_query_intent(query):
-    """Detect if the query is about symptoms, insurance, or clinic search"""
-    q = query.lower()
+def get_cached_providers(provider_type, location):
+    """Get providers from cache, refreshing in the background if necessary"""
+    providers, freshness = get_cached_providers_with_freshness(provider_type, location)
+    note_freshness(freshness)
+    return providers
+
+# Keyword lists used to classify queries (matched as substrings)
+INSURANCE_KEYWORDS = ['insurance', 'coverage', 'plan', 'premium', 'policy', 'aetna', 'cigna',
+                      'blue cross', 'humana', 'medicare', 'medicaid']
+SYMPTOM_INDICATORS = ['pain', 'ache', 'hurt', 'feel', 'symptoms', 'sick', 'ill', 'fever',
+                      'cough', 'nausea', 'vomit', 'dizzy', 'tired', 'fatigue', 'rash',
+                      'swelling', 'headache', 'sore', 'breathing', 'chest']
+SYMPTOM_PHRASES = ['i have', 'i feel', 'experiencing', 'suffering from']
+CLINIC_KEYWORDS = ['doctor', 'clinic', 'hospital', 'physician', 'specialist', 'dentist',
+                   'pediatrician', 'dermatologist', 'cardiologist']
+SEVERITY_KEYWORDS = ['severe', 'intense', 'unbearable', 'extreme', 'terrible', 'sharp',
+                     'chronic', 'constant', 'persistent', 'recurring']
+EMERGENCY_KEYWORDS = ['chest pain', 'cant breathe', 'difficulty breathing', 'severe',
+                      'bleeding', 'unconscious', 'seizure', 'stroke', 'heart attack',
+                      'suicide', 'overdose', 'severe pain']
+URGENT_KEYWORDS = ['fever', 'vomiting', 'severe headache', 'confusion', 'dizziness']
+MATCHER_CACHE_SIZE = 256  # recent query texts whose keyword matches are kept
+
+class Keyword:
+    """A pattern in the keyword matcher; `order` is its position within its kind"""
+
+    __slots__ = ('text', 'kind', 'payload', 'whole_word', 'order')
+
+    def __init__(self, text, kind, payload=None, whole_word=False, order=0):
+        self.text = text
+        self.kind = kind
+        self.payload = payload
+        self.whole_word = whole_word
+        self.order = order
+
+def is_word_char(char):
+    return char.isalnum() or char == '_'
+
+def trie_regex(words):
+    """Regex matching any of `words`, factored into a prefix trie so each
+    position is rejected after a character or two; prefers the longest match.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            body = (f'(?:{body})' if len(branches) == 1 else body) + '?'
+        return body
+
+    return build(trie)
+
+class KeywordMatcher:
+    """Finds every keyword occurrence with one combined regex pass.
+
+    The regex is a prefix-trie lookahead tried at each position, so it reports the
+    longest keyword starting there; shorter keywords are always prefixes of
+    that one and are added from a precomputed table. Overlapping matches
+    are therefore all reported ("chest pain" also yields "chest").
+    Keywords marked `whole_word` only match between word boundaries.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = [keyword for keyword in keywords if keyword.text]
+        by_text = {}
+        for keyword in self.keywords:
+            by_text.setdefault(keyword.text, []).append(keyword)
+        # Keywords matching at the same position as each keyword text, longest first
+        self._at_start = {
+            text: [k for i in range(len(text), 0, -1) for k in by_text.get(text[:i], ())]
+            for text in by_text
+        }
+        self._pattern = re.compile(f"(?=({trie_regex(by_text)}))") if by_text else None
+        # One query is looked up several times per request (intent, symptoms, urgency)
+        self.find = functools.lru_cache(maxsize=MATCHER_CACHE_SIZE)(self._find)
+
+    def _find(self, text):
+        """Return (start, end, keyword) for every match in `text`, in order of start position"""
+        matches = []
+        if self._pattern is None:
+            return ()
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            for keyword in self._at_start[match.group(1)]:
+                end = start + len(keyword.text)
+                if keyword.whole_word and (
+                        (start > 0 and is_word_char(text[start - 1])) or
+                        (end < len(text) and is_word_char(text[end]))):
+                    continue
+                matches.append((start, end, keyword))
+        return tuple(matches)
+
+def build_keyword_matcher(db):
+    """Compile synonyms, symptoms, specialty and classification keywords into one matcher"""
+    keywords = []
+
+    def add(kind, entries, whole_word=False):
+        for order, (text, payload) in enumerate(entries):
+            keywords.append(Keyword(text.lower(), kind, payload,
+                                    whole_word(text) if callable(whole_word) else whole_word, order))
+
+    add('synonym', db.get('symptom_synonyms', {}).items(), whole_word=True)
+    # Single-word symptoms must be whole words; phrases match anywhere
+    add('symptom', db.get('symptoms_database', {}).items(), whole_word=lambda text: ' ' not in text)
+    add('specialty', db.get('specialty_keywords', {}).items())
+    for kind, words in (('insurance', INSURANCE_KEYWORDS), ('symptom_indicator', SYMPTOM_INDICATORS),
+                        ('symptom_phrase', SYMPTOM_PHRASES), ('clinic', CLINIC_KEYWORDS),
+                        ('severity', SEVERITY_KEYWORDS), ('emergency', EMERGENCY_KEYWORDS),
+                        ('urgent', URGENT_KEYWORDS)):
+        add(kind, [(word, None) for word in words])
+    return KeywordMatcher(keywords)
+
+def knowledge_suggestions(db):
+    """Symptoms, specialties and insurers of the knowledge base as typeahead suggestions"""
+    suggestions = [(symptom, 'symptom') for symptom in db.get('symptoms_database', {})]
+    suggestions += [(specialty, 'specialty') for specialty in set(db.get('specialty_keywords', {}).values())]
+    suggestions += [(provider.get('name', ''), 'insurance') for provider in db.get('insurance_providers', [])]
+    return suggestions
+
+def knowledge_vocabulary(db):
+    """Words of the knowledge base, insurer names and classification keywords, for spelling correction"""
+    texts = list(db.get('symptoms_database', {}))
+    for mapping in ('symptom_synonyms', 'specialty_keywords'):
+        for text, replacement in db.get(mapping, {}).items():
+            texts += [text, replacement]
+    texts += [provider.get('name', '') for provider in db.get('insurance_providers', [])]
+    for words in (COMMON_QUERY_WORDS, INSURANCE_KEYWORDS, SYMPTOM_INDICATORS, CLINIC_KEYWORDS, SEVERITY_KEYWORDS,
+                  EMERGENCY_KEYWORDS, URGENT_KEYWORDS):
+        texts += words
+    return tokenize(' '.join(texts))
+
+_keyword_matcher = None
+_keyword_matcher_version = None
+_keyword_matcher_lock = threading.Lock()
+
+def keyword_matcher():
+    """The compiled matcher for the current knowledge base, rebuilt when it changes
+    (along with the knowledge base words in the spelling vocabulary and typeahead)
+    """
+    global _keyword_matcher, _keyword_matcher_version
+    version = data_versions.get('medical')
+    if _keyword_matcher is None or _keyword_matcher_version != version:
+        with _keyword_matcher_lock:
+            if _keyword_matcher is None or _keyword_matcher_version != version:
+                _keyword_matcher = build_keyword_matcher(medical_db)
+                fuzzy_index.replace('knowledge', knowledge_vocabulary(medical_db))
+                suggestion_index.replace('knowledge', knowledge_suggestions(medical_db))
+                _keyword_matcher_version = version
+    return _keyword_matcher
+
+def matched_keywords(matches, kind):
+    """Distinct keywords of one kind, in their configured order"""
+    found = {keyword.text: keyword for _, _, keyword in matches if keyword.kind == kind}
+    return sorted(found.values(), key=lambda keyword: keyword.order)
+
+class QueryAnalysis:
+    """Everything derived from one search query, computed at most once.
+
+    Built once per /search request and passed to detect_query_intent,
+    analyze_symptoms, search_clinics, search_clinics_by_specialty and
+    search_insurance (which also accept a plain query string). Unknown words
+    close to a known one are corrected first (see `corrections`); `raw_text`
+    keeps the query as typed. Each stage is computed on first use and its
+    time in milliseconds recorded in `timings`.
+    """
+
+    def __init__(self, query):
+        self.query = query
+        self.raw_text = self.text = ' '.join(query.lower().split())
+        self.tokens = tokenize(query)
+        self.timings = {}
+        self._stages = {}
+        # Misspelled words are corrected before anything else looks at the query
+        self.corrections = self._stage('spelling', lambda: correct_spelling(self.tokens))
+        if self.corrections:
+            self.text = TOKEN_PATTERN.sub(lambda m: self.corrections.get(m.group(), m.group()), self.text)
+            self.tokens = [self.corrections.get(token, token) for token in self.tokens]
+        self.words = self.text.split()
+
+    def _stage(self, name, compute):
+        if name not in self._stages:
+            start = time.perf_counter()
+            self._stages[name] = compute()
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 3)
+        return self._stages[name]
+
+    @contextmanager
+    def timed(self, name):
+        """Time a search step that uses this analysis"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    @property
+    def matches(self):
+        """Keyword matches in the raw query"""
+        return self._stage('match', lambda: keyword_matcher().find(self.text))
+
+    @property
+    def normalized(self):
+        return self._stage('normalize', lambda: apply_synonyms(self.text, self.matches))
+
+    @property
+    def normalized_matches(self):
+        """Keyword matches in the synonym-normalized query"""
+        if self.normalized == self.text:
+            return self.matches
+        return self._stage('match_normalized', lambda: keyword_matcher().find(self.normalized))
+
+    @property
+    def intent(self):
+        return self._stage('intent', lambda: classify_intent(self.matches))
+
+    @property
+    def symptom_matches(self):
+        """(matched symptoms, possible conditions) from the symptoms database"""
+        return self._stage('symptom_match', lambda: match_symptoms(self.normalized_matches))
+
+    @property
+    def matched_symptoms(self):
+        return self.symptom_matches[0]
+
+    @property
+    def urgency(self):
+        return self._stage('urgency', lambda: assess_urgency(self.matched_symptoms, self.normalized_matches))
+
+    @property
+    def symptoms(self):
+        """The medical advice payload returned by analyze_symptoms"""
+        return self._stage('symptoms', lambda: build_symptom_analysis(self))
+
+    @property
+    def specialties(self):
+        return self._stage('specialties', lambda: suggest_specialties(self))
+
+    def to_dict(self):
+        return {
+            'tokens': self.tokens,
+            'corrections': self.corrections,
+            'normalized': self.normalized,
+            'intent': self.intent,
+            'matched_symptoms': self.matched_symptoms,
+            'urgency': self.urgency,
+            'specialties': sorted(self.specialties),
+            'timings': self.timings
+        }
+
+def correct_spelling(tokens):
+    """{misspelled token: correction} against providers, insurers and the knowledge base"""
+    keyword_matcher()  # brings the knowledge base words up to date
+    refresh_clinic_index()
+    return fuzzy_index.correct(tokens)
+
+def as_query_analysis(query):
+    return query if isinstance(query, QueryAnalysis) else QueryAnalysis(query)
+
+def classify_intent(matches):
+    """Intent from the keyword matches of the raw query"""
+    kinds = {keyword.kind for _, _, keyword in matches}
     
     # Insurance keywords
-    insurance_keywords = ['insurance', 'coverage', 'plan', 'premium', 'policy', 'aetna', 'cigna', 
-                          'blue cross', 'humana', 'medicare', 'medicaid']
-    if any(keyword in q for keyword in insurance_keywords):
+    if 'insurance' in kinds:
         return 'insurance'
     
     # Symptom indicators
-    symptom_indicators = ['pain', 'ache', 'hurt', 'feel', 'symptoms', 'sick', 'ill', 'fever', 
-                          'cough', 'nausea', 'vomit', 'dizzy', 'tired', 'fatigue', 'rash', 
-                          'swelling', 'headache', 'sore', 'breathing', 'chest']
-    symptom_phrases = ['i have', 'i feel', 'experiencing', 'suffering from']
-    
-    if any(phrase in q for phrase in symptom_phrases):
+    if 'symptom_phrase' in kinds:
         return 'symptom'
     
     # Count symptom keywords
-    symptom_count = sum(1 for word in symptom_indicators if word in q)
-    if symptom_count >= 2:
+    if len(matched_keywords(matches, 'symptom_indicator')) >= 2:
         return 'symptom'
     
     # Check against symptom database
-    words = q.split()
-    for word in words:
-        if word in medical_db.get('symptoms_database', {}):
-            return 'symptom'
+    if any(keyword.kind == 'symptom' and keyword.whole_word for _, _, keyword in matches):
+        return 'symptom'
     
     # Clinic/provider keywords
-    clinic_keywords = ['doctor', 'clinic', 'hospital', 'physician', 'specialist', 'dentist', 
-                       'pediatrician', 'dermatologist', 'cardiologist']
-    if any(keyword in q for keyword in clinic_keywords):
+    if 'clinic' in kinds:
         return 'clinic'
     
     # Default to mixed if unclear
     return 'mixed'
 
+def detect_query_intent(query):
+    """Detect if the query is about symptoms, insurance, or clinic search"""
+    return as_query_analysis(query).intent
+
+def apply_synonyms(text, matches):
+    """Rewrite symptom synonyms in `text`, leftmost-longest where they overlap"""
+    synonyms = sorted(((start, end, keyword) for start, end, keyword in matches
+                       if keyword.kind == 'synonym'),
+                      key=lambda match: (match[0], -match[1]))
+    
+    parts = []
+    position = 0
+    for start, end, keyword in synonyms:
+        if start < position:
+            continue
+        parts.append(text[position:start])
+        parts.append(keyword.payload)
+        position = end
+    parts.append(text[position:])
+    return ''.join(parts)
+
 def normalize_query(query):
     """Normalize query by applying synonyms and expanding terms"""
-    q = query.lower()
-    
-    # Apply symptom synonyms
-    for synonym, replacement in medical_db.get('symptom_synonyms', {}).items():
-        if synonym in q:
-            q = q.replace(synonym, replacement)
-    
-    return q
+    return as_query_analysis(query).normalized
+
+class ClinicMatches:
+    """Providers matched by one search, with that search's scores kept beside them.
+
+    Provider records are shared by every request, so per-search values live
+    in parallel lists here: `relevance` (the ranking's relevance_score) and
+    `suggested_for` (specialties a match was suggested for, or None).
+    """
+
+    __slots__ = ('providers', 'relevance', 'suggested_for')
+
+    def __init__(self):
+        self.providers = []
+        self.relevance = []
+        self.suggested_for = []
+
+    def add(self, provider, relevance, suggested_for=None):
+        self.providers.append(provider)
+        self.relevance.append(relevance)
+        self.suggested_for.append(suggested_for)
+
+    def __len__(self):
+        return len(self.providers)
+
+    def rows(self, order, distances):
+        """Response rows for the matches at `order`, with their distances (parallel to `order`)"""
+        rows = []
+        for i, distance in zip(order, distances):
+            row = self.providers[i].to_dict()
+            row['relevance_score'] = self.relevance[i]
+            row['distance'] = distance
+            if self.suggested_for[i] is not None:
+                row['suggested_for'] = self.suggested_for[i]
+            rows.append(row)
+        return rows
+
+def normalize_relevance(scored, scale=RELEVANCE_SCALE):
+    """ClinicMatches with BM25F scores scaled so the best match gets `scale`"""
+    best = max((score for _, score in scored), default=0)
+    matches = ClinicMatches()
+    for provider, score in scored:
+        matches.add(provider, round(scale * score / best, 3) if best > 0 else 0)
+    return matches
 
 def search_clinics(query, location=None):
-    """Enhanced clinic search with better matching and scoring"""
-    matches = []
-    query_normalized = normalize_query(query)
-    query_lower = query.lower()
+    """Enhanced clinic search with BM25F relevance scoring, as ClinicMatches.
+    Only providers the inverted index returns as candidates are scored; field
+    weights are in BM25_FIELD_WEIGHTS.
+    """
+    analysis = as_query_analysis(query)
+    words = analysis.tokens
     
-    # Get providers from cache/web scraping
+    # Get candidates from cache/web scraping
     if location:
         providers = get_cached_providers('healthcare', location)
+        group = ('healthcare', location_key(location))
+        if provider_index.covers(group, providers):
+            scored = provider_index.search(words, groups=[group])
+        else:
+            # Fallback providers are not indexed; score them against the index statistics
+            scored = list(zip(providers, provider_index.score(providers, words)))
     else:
-        providers = []
-        for loc_providers in scraped_cache['healthcare'].values():
-            if isinstance(loc_providers, list):
-                providers.extend(loc_providers)
-    
-    # Search scraped providers with relevance scoring
-    for provider in providers:
-        score = 0
-        provider_name = provider.get('name', '').lower()
-        provider_address = provider.get('address', '').lower()
-        
-        # Name match (highest weight)
-        if query_lower in provider_name:
-            score += 10
-            provider['relevance_score'] = score
-            matches.append(provider)
-            continue
-        
-        # Address/location match
-        if query_lower in provider_address:
-            score += 5
-            provider['relevance_score'] = score
-            matches.append(provider)
-            continue
-        
-        # Partial word matches
-        query_words = query_lower.split()
-        for word in query_words:
-            if len(word) > 3:  # Only meaningful words
-                if word in provider_name:
-                    score += 3
-                if word in provider_address:
-                    score += 1
-        
-        if score > 0:
-            provider['relevance_score'] = score
-            matches.append(provider)
+        groups = [('healthcare', key) for key in scraped_cache['healthcare'].keys()]
+        scored = provider_index.search(words, groups=groups)
+    # An empty query matches everything
+    matches = [(provider, score) for provider, score in scored if score > 0 or not words]
     
     # Add local database results as fallback
-    for clinic in medical_db['clinics']:
-        if location and location.lower() not in clinic['location'].lower():
+    clinic_records()
+    matched_names = {provider.get('name') for provider, _ in matches}
+    for clinic, score in provider_index.search(words, groups=[CLINICS_GROUP]):
+        if location and location_key(clinic['location']) != location_key(location):
             continue
-        
-        score = 0
-        clinic_name = clinic['name'].lower()
-        
-        # Direct name match
-        if query_lower in clinic_name:
-            score += 10
-        
-        # Specialty match
-        if 'specialties' in clinic:
-            for specialty in clinic['specialties']:
-                if query_lower in specialty.lower():
-                    score += 8
-        
-        # Insurance match
-        if 'insurance' in clinic:
-            for insurance in clinic['insurance']:
-                if query_lower in insurance.lower():
-                    score += 3
-        
-        if score > 0:
-            clinic['relevance_score'] = score
-            # Avoid duplicates
-            if not any(m.get('name') == clinic['name'] for m in matches):
-                matches.append(clinic)
+        # Avoid duplicates
+        if (score > 0 or not words) and clinic['name'] not in matched_names:
+            matched_names.add(clinic['name'])
+            matches.append((clinic, score))
     
-    return matches
+    return normalize_relevance(matches)
 
-def search_clinics_by_specialty(query, location=None):
-    """Search clinics based on symptoms/conditions to suggest appropriate specialties"""
-    matches = []
-    query_normalized = normalize_query(query)
-    
-    # Analyze symptoms to determine needed specialties
-    symptom_analysis = analyze_symptoms(query)
+DEFAULT_SPECIALTY = 'General Practice'  # for conditions missing from condition_specialties
+# How specialties are named in recommendations, if not just lowercased
+SPECIALTY_LABELS = {'Psychiatry': 'psychiatry or mental health', 'ENT': 'ENT (ear, nose and throat)'}
+
+_condition_index = None
+_condition_index_version = None
+
+def build_condition_index(db):
+    """Lowercased condition -> specialties, from the knowledge base's condition_specialties"""
+    index = {}
+    for condition, specialties in db.get('condition_specialties', {}).items():
+        index[condition.lower()] = (specialties,) if isinstance(specialties, str) else tuple(specialties)
+    return index
+
+def specialties_for_condition(condition):
+    """Specialties that treat `condition`, from an index rebuilt when the knowledge base changes"""
+    global _condition_index, _condition_index_version
+    version = data_versions.get('medical')
+    if _condition_index is None or _condition_index_version != version:
+        _condition_index = build_condition_index(medical_db)
+        _condition_index_version = version
+    return _condition_index.get(condition.lower(), (DEFAULT_SPECIALTY,))
+
+def suggest_specialties(analysis):
+    """Specialties suggested by the query's possible conditions and specialty keywords"""
     suggested_specialties = set()
     
     # Map conditions to specialties
-    for condition in symptom_analysis.get('possible_conditions', []):
-        condition_lower = condition.lower()
-        # Add specialty mapping logic
-        if any(term in condition_lower for term in ['heart', 'cardiac', 'angina']):
-            suggested_specialties.add('Cardiology')
-        elif any(term in condition_lower for term in ['skin', 'rash', 'eczema', 'psoriasis']):
-            suggested_specialties.add('Dermatology')
-        elif any(term in condition_lower for term in ['mental', 'depression', 'anxiety', 'stress']):
-            suggested_specialties.add('Psychiatry')
-        elif any(term in condition_lower for term in ['child', 'pediatric']):
-            suggested_specialties.add('Pediatrics')
-        else:
-            suggested_specialties.add('General Practice')
+    for condition in analysis.symptoms.get('possible_conditions', []):
+        suggested_specialties.update(specialties_for_condition(condition))
     
     # Check specialty keywords in query
-    for keyword, specialty in medical_db.get('specialty_keywords', {}).items():
-        if keyword in query.lower():
-            suggested_specialties.add(specialty)
+    for keyword in matched_keywords(analysis.matches, 'specialty'):
+        suggested_specialties.add(keyword.payload)
+    
+    return suggested_specialties
+
+def search_clinics_by_specialty(query, location=None):
+    """Search clinics based on symptoms/conditions to suggest appropriate specialties, as ClinicMatches"""
+    analysis = as_query_analysis(query)
+    matches = ClinicMatches()
+    suggested_specialties = analysis.specialties
     
-    # Get providers
+    # Providers come from the specialty postings of the cached locations, then the local DB clinics
+    clinic_records()
+    unindexed = []
     if location:
         providers = get_cached_providers('healthcare', location)
+        group = ('healthcare', location_key(location))
+        if provider_index.covers(group, providers):
+            groups = [group, CLINICS_GROUP]
+        else:
+            # Fallback providers are not indexed and are checked one by one
+            groups = [CLINICS_GROUP]
+            unindexed = providers
     else:
-        providers = []
-        for loc_providers in scraped_cache['healthcare'].values():
-            if isinstance(loc_providers, list):
-                providers.extend(loc_providers)
+        groups = [('healthcare', key) for key in scraped_cache['healthcare'].keys()] + [CLINICS_GROUP]
     
-    # Add local DB clinics
-    all_clinics = list(providers) + medical_db.get('clinics', [])
+    def with_specialties(terms):
+        found = [provider for provider in unindexed
+                 if any(term in specialty for specialty in provider_specialties(provider) for term in terms)]
+        return found + provider_index.with_specialties(terms, groups)
     
     # Filter by specialties if we found any
     if suggested_specialties:
-        for clinic in all_clinics:
-            clinic_specialties = clinic.get('specialties', [])
-            if isinstance(clinic_specialties, list):
-                for specialty in clinic_specialties:
-                    if any(sugg.lower() in specialty.lower() for sugg in suggested_specialties):
-                        clinic['relevance_score'] = 8
-                        clinic['suggested_for'] = list(suggested_specialties)
-                        matches.append(clinic)
-                        break
+        terms = [specialty.lower() for specialty in suggested_specialties]
+        for clinic in with_specialties(terms):
+            matches.add(clinic, 8, list(suggested_specialties))
     
     # If no specialty matches, return general practitioners
     if not matches:
-        for clinic in all_clinics:
-            specialties = clinic.get('specialties', [])
-            if any('general' in str(s).lower() for s in specialties):
-                clinic['relevance_score'] = 5
-                matches.append(clinic)
+        for clinic in with_specialties(['general']):
+            matches.add(clinic, 5)
     
     return matches
 
-def rank_clinic_results(clinics):
-    """Rank clinic results by relevance, rating, and distance"""
-    def get_sort_key(clinic):
-        relevance = clinic.get('relevance_score', 0)
+# Clinic ranking weights: score = relevance * w + rating * w - distance (miles) * w
+RANKING_WEIGHTS = {'relevance': 0.4, 'rating': 0.4, 'distance': 0.02}
+VECTORIZED_RANKING_MIN = 256  # candidate count from which scores are computed with NumPy
+
+def ranking_weights(weights=None):
+    return RANKING_WEIGHTS if weights is None else dict(RANKING_WEIGHTS, **weights)
+
+def clinic_order_per_item(clinics, limit=None, weights=None, distances=None, relevance=None):
+    """Ranked indices into `clinics` from a per-item key function (heap top-k when `limit` is given)"""
+    weights = ranking_weights(weights)
+    relevance_weight = weights['relevance']
+    rating_weight = weights['rating']
+    distance_weight = weights['distance']
+    
+    def get_sort_key(i):
+        clinic = clinics[i]
+        score = clinic.get('relevance_score', 0) if relevance is None else relevance[i]
         rating = clinic.get('rating', 0) or 0
-        distance = clinic.get('distance', 999) or 999
+        distance = clinic.get('distance') if distances is None else distances[i]
+        if distance is None:
+            distance = 999  # unknown distance ranks last; a clinic 0 mi away keeps 0
         
-        # Weighted scoring: relevance (40%), rating (40%), distance (20%)
-        score = (relevance * 0.4) + (rating * 0.4) - (distance * 0.02)
+        score = (score * relevance_weight) + (rating * rating_weight) - (distance * distance_weight)
         return -score  # Negative for descending sort
     
-    return sorted(clinics, key=get_sort_key)
+    if limit is not None and limit < len(clinics):
+        # Same order as sorted(...)[:limit], ties included
+        return heapq.nsmallest(limit, range(len(clinics)), key=get_sort_key)
+    return sorted(range(len(clinics)), key=get_sort_key)
+
+def top_k_indices(keys, limit=None):
+    """Indices of the `limit` smallest keys in ascending order, ties by position
+    (what a stable sort cut to `limit` would give), found with argpartition.
+    """
+    n = len(keys)
+    if limit is None or limit >= n:
+        return np.argsort(keys, kind='stable')
+    if limit <= 0:
+        return np.empty(0, dtype=np.intp)
+    threshold = keys[np.argpartition(keys, limit - 1)[limit - 1]]
+    below = np.flatnonzero(keys < threshold)
+    ties = np.flatnonzero(keys == threshold)[:limit - len(below)]
+    chosen = np.concatenate((below, ties))
+    return chosen[np.lexsort((chosen, keys[chosen]))]
+
+def clinic_order_vectorized(clinics, limit=None, weights=None, distances=None, relevance=None):
+    """Same order as clinic_order_per_item, scored as NumPy arrays in one batch"""
+    weights = ranking_weights(weights)
+    n = len(clinics)
+    if relevance is None:
+        relevance = [c.get('relevance_score', 0) for c in clinics]
+    relevance = np.fromiter(relevance, dtype=np.float64, count=n)
+    rating = np.fromiter((c.get('rating', 0) or 0 for c in clinics), dtype=np.float64, count=n)
+    if distances is None:
+        distances = [c.get('distance') for c in clinics]
+    distance = np.fromiter((999 if d is None else d for d in distances), dtype=np.float64, count=n)
+    
+    scores = (relevance * weights['relevance']) + (rating * weights['rating']) - (distance * weights['distance'])
+    return top_k_indices(-scores, limit)
+
+def rank_clinic_order(clinics, limit=None, weights=None, distances=None, relevance=None):
+    """Indices of `clinics` ranked by relevance, rating, and distance.
+    With `limit`, only the best `limit` are selected rather than sorting everything.
+    `weights` overrides entries of RANKING_WEIGHTS. `distances` (miles) and
+    `relevance`, parallel to `clinics`, replace each clinic's own `distance`
+    and `relevance_score`. Large candidate sets are scored with NumPy.
+    """
+    if len(clinics) >= VECTORIZED_RANKING_MIN:
+        return clinic_order_vectorized(clinics, limit, weights, distances, relevance)
+    return clinic_order_per_item(clinics, limit, weights, distances, relevance)
+
+def rank_clinics_per_item(clinics, limit=None, weights=None, distances=None, relevance=None):
+    return [clinics[i] for i in clinic_order_per_item(clinics, limit, weights, distances, relevance)]
+
+def rank_clinics_vectorized(clinics, limit=None, weights=None, distances=None, relevance=None):
+    return [clinics[i] for i in clinic_order_vectorized(clinics, limit, weights, distances, relevance)]
+
+def rank_clinic_results(clinics, limit=None, weights=None, distances=None, relevance=None):
+    """Rank clinic results by relevance, rating, and distance (see rank_clinic_order)"""
+    return [clinics[i] for i in rank_clinic_order(clinics, limit, weights, distances, relevance)]
+
+def rank_insurance_results(providers, limit=None):
+    """Best insurance matches first (name over description/coverage), keeping source order on ties"""
+    def get_sort_key(provider):
+        return -provider.get('relevance_score', 0)
+    
+    if limit is not None and limit < len(providers):
+        return heapq.nsmallest(limit, providers, key=get_sort_key)
+    return sorted(providers, key=get_sort_key)
 
 def search_insurance(query, location=None):
     """Search insurance providers across scraped cache and local DB.
     Returns enriched records with phone, website, coverage_types (if available), and description.
+    The query is matched as typed; its spelling corrections are only tried if that finds nothing.
     """
+    analysis = as_query_analysis(query)
+    matches = match_insurance(analysis.raw_text, location)
+    if not matches and analysis.text != analysis.raw_text:
+        matches = match_insurance(analysis.text, location)
+    return matches
+
+def match_insurance(q, location=None):
+    """Insurance providers whose name, description or coverage types contain the query text `q`"""
     matches = []
-    q = query.lower()
 
     scraped = []
     if location:
@@ -864,21 +4012,25 @@ def search_insurance(query, location=None):
                 'phone': provider.get('phone'),
                 'website': provider.get('website') or provider.get('url'),
                 'coverage_types': provider.get('coverage_types', []),
-                'source': provider.get('source', 'scraped')
+                'source': provider.get('source', 'scraped'),
+                'relevance_score': 10 if q and q in name_l else 5 if q else 0
             })
 
     # Fallback to local DB
+    matched_names = {m['name'] for m in matches}
     for provider in medical_db.get('insurance_providers', []):
         name_l = provider.get('name', '').lower()
         coverage_list = provider.get('coverage_types', [])
-        if (not q or q in name_l or any(q in c.lower() for c in coverage_list)) and not any(m['name'] == provider['name'] for m in matches):
+        if (not q or q in name_l or any(q in c.lower() for c in coverage_list)) and provider['name'] not in matched_names:
+            matched_names.add(provider['name'])
             matches.append({
                 'name': provider.get('name'),
                 'description': provider.get('description', ''),
                 'phone': provider.get('phone') or provider.get('contact'),
                 'website': provider.get('website') or provider.get('url'),
                 'coverage_types': coverage_list,
-                'source': 'local'
+                'source': 'local',
+                'relevance_score': 10 if q and q in name_l else 5 if q else 0
             })
 
     return matches
@@ -912,6 +4064,7 @@ def get_providers():
             providers['insurance'] = [provider['name'] for provider in medical_db['insurance_providers']]
         
         if provider_type == 'all':
+            providers['freshness'] = g.get('data_freshness', 'fresh')
             return jsonify(providers)
         elif provider_type in providers:
             return jsonify(providers[provider_type])
@@ -922,51 +4075,104 @@ def get_providers():
         logger.error(f"Error getting providers: {str(e)}")
         return jsonify({'error': 'Failed to fetch providers'}), 500
     
+def sort_graph_rows(rows):
+    """Sort providers by distance if available, then by rating (best first), as arrays"""
+    n = len(rows)
+    distance = np.fromiter((np.inf if r['distance'] == 'N/A' else float(r['distance']) for r in rows),
+                           dtype=np.float64, count=n)
+    rating = np.fromiter((-np.inf if r['rating'] is None else -float(r['rating']) for r in rows),
+                         dtype=np.float64, count=n)
+    # lexsort is stable and sorts by the last key first
+    return [rows[i] for i in np.lexsort((rating, distance))]
+
+def build_healthcare_graph(location, origin=None):
+    """Provider graph rows for a location, with distances from `origin`,
+    plus the freshness of the data behind them
+    """
+    # Get providers from cache/scraping
+    providers = []
+    if location:
+        providers.extend(get_cached_providers('healthcare', location))
+    
+    # If no scraped results, fall back to database
+    if not providers:
+        providers = clinic_records()
+    
+    # Build graph data
+    graph_data = []
+    for provider, distance in zip(providers, provider_distances(providers, origin)):
+        # Find average score for this provider
+        scores = [r['rating'] for r in reviews_db['healthcare'] 
+                 if r['provider_name'] == provider['name']]
+        avg_score = round(sum(scores)/len(scores), 2) if scores else None
+        
+        provider_data = {
+            'name': provider['name'],
+            'address': provider.get('address', 'Address not available'),
+            'phone': provider.get('phone', 'Phone not available'),
+            'website': provider.get('website', '#'),
+            'rating': avg_score,
+            'distance': 'N/A' if distance is None else distance,
+            'source': provider.get('source', 'Local Database')
+        }
+        
+        graph_data.append(provider_data)
+    
+    return sort_graph_rows(graph_data), g.get('data_freshness', 'fresh')
+
 @app.route('/healthcare_graph', methods=['GET'])
 def healthcare_graph():
     try:
         # Get location from query params
         location = request.args.get('location', None)
         
-        # Get providers from cache/scraping
-        providers = []
-        if location:
-            providers.extend(get_cached_providers('healthcare', location))
-        
-        # If no scraped results, fall back to database
-        if not providers:
-            providers = medical_db['clinics']
+        origin = request_origin(location)
         
-        # Build graph data
-        graph_data = []
-        for provider in providers:
-            # Find average score for this provider
-            scores = [r['rating'] for r in reviews_db['healthcare'] 
-                     if r['provider_name'] == provider['name']]
-            avg_score = round(sum(scores)/len(scores), 2) if scores else None
-            
-            provider_data = {
-                'name': provider['name'],
-                'address': provider.get('address', 'Address not available'),
-                'phone': provider.get('phone', 'Phone not available'),
-                'website': provider.get('website', '#'),
-                'rating': avg_score,
-                'distance': provider.get('distance', 'N/A'),
-                'source': provider.get('source', 'Local Database')
-            }
-            
-            graph_data.append(provider_data)
-        # Sort providers by distance if available, then by rating
-        graph_data.sort(key=lambda x: (
-            float('inf') if x['distance'] == 'N/A' else float(x['distance']),
-            float('-inf') if x['rating'] is None else -float(x['rating'])
-        ))
+        # Identical graph requests arriving together share one computation
+        key = ('healthcare_graph', location_key(location) if location else None, origin)
+        graph_data, freshness = request_coalescer.do(key, lambda: build_healthcare_graph(location, origin))
+        note_freshness(freshness)
         
         return jsonify(graph_data)
     except Exception as e:
         logger.error(f"Error generating healthcare graph: {str(e)}")
         return jsonify({'error': 'Failed to generate healthcare graph'}), 500
 
+@app.route('/nearby-providers', methods=['GET'])
+def nearby_providers():
+    """Nearest healthcare providers within `radius` km of `latitude`/`longitude`
+    (default: the caller's shared position), from every cached location and the local clinics
+    """
+    try:
+        if 'latitude' in request.args or 'longitude' in request.args:
+            origin = float(request.args['latitude']), float(request.args['longitude'])
+        else:
+            origin = request_origin()
+        radius = min(float(request.args.get('radius', NEARBY_RADIUS_KM)), NEARBY_MAX_RADIUS_KM)
+        limit = min(max(int(request.args.get('limit', NEARBY_LIMIT)), 1), SEARCH_MAX_PAGE_SIZE)
+    except (KeyError, ValueError):
+        return jsonify({'error': 'Invalid latitude, longitude, radius or limit'}), 400
+    if origin is None:
+        return jsonify({'error': 'No position: pass latitude and longitude or share your location'}), 400
+    if not valid_coordinates(*origin) or not radius > 0:
+        return jsonify({'error': 'Latitude must be within -90..90, longitude within -180..180 '
+                                 'and radius above 0'}), 400
+    
+    refresh_clinic_index()
+    providers = []
+    for provider, km in spatial_index.nearest(origin[0], origin[1], radius, limit):
+        providers.append({
+            'name': provider.get('name'),
+            'address': provider.get('address', 'Address not available'),
+            'phone': provider.get('phone', 'Phone not available'),
+            'website': provider.get('website', '#'),
+            'rating': provider.get('rating'),
+            'distance': round(km / KM_PER_MILE, 1),
+            'source': provider.get('source', 'Local Database')
+        })
+    return jsonify({'origin': {'latitude': origin[0], 'longitude': origin[1]}, 'radius_km': radius,
+                    'providers': providers})
+
 ## Removed /insurance_providers endpoint (insurance now served via unified /search)
 
 @app.route('/get-provider-graph', methods=['GET'])
@@ -987,7 +4193,7 @@ def get_scraping_progress():
         progress_data = {}
         
         if provider_type in ['all', 'healthcare']:
-            progress_data['healthcare'] = scraping_progress['healthcare'].get(location, {
+            progress_data['healthcare'] = scraping_progress['healthcare'].get(location_key(location), {
                 'status': 'not_started',
                 'providers': [],
                 'progress': 0,
@@ -995,18 +4201,121 @@ def get_scraping_progress():
             })
         
         if provider_type in ['all', 'insurance']:
-            progress_data['insurance'] = scraping_progress['insurance'].get(location, {
+            progress_data['insurance'] = scraping_progress['insurance'].get(location_key(location), {
                 'status': 'not_started',
                 'providers': [],
                 'progress': 0,
                 'total': 0
             })
         
+        # False once the scrape job has stored its results, which is after both statuses finish
+        progress_data['scraping'] = scrape_scheduler.is_active(location)
+        
         return jsonify(progress_data)
     except Exception as e:
         logger.error(f"Error getting scraping progress: {str(e)}")
         return jsonify({'error': 'Failed to get scraping progress'}), 500
 
+@app.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Per-location cache entries with age, TTL, hit count and size"""
+    return jsonify({
+        'providers': {t: cache.stats() for t, cache in scraped_cache.items()},
+        'progress': {t: cache.stats() for t, cache in scraping_progress.items()},
+        'provider_index': provider_index.stats(),
+        'spelling_vocabulary': fuzzy_index.stats(),
+        'suggestions': suggestion_index.stats(),
+        'spatial_index': spatial_index.stats(),
+        'search_results': search_result_cache.stats(),
+        'search_snapshots': {'entries': len(search_snapshots), 'max_entries': search_snapshots.max_entries,
+                             'ttl': search_snapshots.ttl}
+    })
+
+@app.route('/scraper-wait-stats', methods=['GET'])
+def get_scraper_wait_stats():
+    """How long the scrapers actually spent waiting on each page condition"""
+    return jsonify(wait_recorder.stats())
+
+@app.route('/fetcher-stats', methods=['GET'])
+def get_fetcher_stats():
+    """How often each insurance fetch tier succeeded, came back empty or errored"""
+    return jsonify(insurance_fetcher.stats())
+
+@app.route('/coalescing-stats', methods=['GET'])
+def get_coalescing_stats():
+    """How many identical concurrent requests each /search and /healthcare_graph computation served"""
+    return jsonify(request_coalescer.stats())
+
+@app.route('/driver-pool-stats', methods=['GET'])
+def get_driver_pool_stats():
+    """Expose Chrome driver pool usage (wait times, live drivers, recycles)"""
+    return jsonify(driver_pool.stats())
+
+def progress_snapshot(location):
+    """Current progress for both provider types, as served by /scraping-progress"""
+    empty = {'status': 'not_started', 'providers': [], 'progress': 0, 'total': 0}
+    key = location_key(location)
+    return {
+        'healthcare': scraping_progress['healthcare'].get(key, empty),
+        'insurance': scraping_progress['insurance'].get(key, empty)
+    }
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/scraping-progress/stream', methods=['GET'])
+def stream_scraping_progress():
+    """Stream live scraping progress as Server-Sent Events.
+    Sends a 'snapshot' first, then incremental 'provider' and 'status' events,
+    a 'job' event when a scrape job has stored its results, and a final 'done'
+    once both provider types have finished and no scrape of the location is running.
+    Clients without EventSource support can keep polling /scraping-progress.
+    """
+    location = request.args.get('location', None)
+    if not location:
+        return jsonify({'error': 'Location parameter required'}), 400
+    
+    # Subscribe before taking the snapshot so no event falls in between
+    subscriber = progress_broker.subscribe(location)
+    
+    def generate():
+        finished = ('complete', 'failed', 'cancelled')
+        try:
+            snapshot = progress_snapshot(location)
+            statuses = {t: p['status'] for t, p in snapshot.items()}
+            yield f"retry: 3000\n\n" + sse_event('snapshot', snapshot)
+            
+            deadline = time.time() + SSE_MAX_STREAM
+            while time.time() < deadline:
+                # The scrapers report 'complete' before their results are stored; the job's end follows that
+                if (all(status in finished for status in statuses.values()) and
+                        not scrape_scheduler.is_active(location)):
+                    yield sse_event('done', statuses)
+                    return
+                
+                if subscriber.overflowed:
+                    subscriber.overflowed = False
+                    snapshot = progress_snapshot(location)
+                    statuses = {t: p['status'] for t, p in snapshot.items()}
+                    yield sse_event('snapshot', snapshot)
+                    continue
+                
+                item = subscriber.next(timeout=SSE_HEARTBEAT)
+                if item is None:
+                    yield ": keepalive\n\n"
+                    continue
+                event, data = item
+                if event == 'status':
+                    statuses[data['type']] = data['status']
+                yield sse_event(event, data)
+        finally:
+            progress_broker.unsubscribe(subscriber)
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/start-scraping', methods=['POST'])
 def start_scraping():
     """Start live scraping for a specific location"""
@@ -1017,28 +4326,47 @@ def start_scraping():
         if not location:
             return jsonify({'error': 'Location parameter required'}), 400
         
-        # Check if already scraping
-        healthcare_status = scraping_progress['healthcare'].get(location, {}).get('status', 'not_started')
-        insurance_status = scraping_progress['insurance'].get(location, {}).get('status', 'not_started')
+        # Queue the scrape; an existing job for this location is reused
+        job, created = scrape_scheduler.submit(location, live_update=True, priority=PRIORITY_INTERACTIVE)
         
-        if healthcare_status == 'scraping' or insurance_status == 'scraping':
+        if not created:
             return jsonify({
                 'message': 'Scraping already in progress',
-                'status': 'in_progress'
+                'status': 'in_progress',
+                'job_id': job.id
             })
         
-        # Start scraping with live updates
-        update_provider_cache(location, live_update=True)
-        
         return jsonify({
             'message': 'Scraping started',
             'status': 'started',
-            'location': location
+            'location': location,
+            'location_key': job.key,
+            'job_id': job.id
         })
     except Exception as e:
         logger.error(f"Error starting scraping: {str(e)}")
         return jsonify({'error': 'Failed to start scraping'}), 500
 
+@app.route('/scrape-jobs', methods=['GET'])
+def get_scrape_jobs():
+    """List queued, running and recently finished scrape jobs"""
+    return jsonify(scrape_scheduler.jobs())
+
+@app.route('/scrape-jobs/<int:job_id>', methods=['GET'])
+def get_scrape_job(job_id):
+    job = scrape_scheduler.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/scrape-jobs/<int:job_id>/cancel', methods=['POST'])
+def cancel_scrape_job(job_id):
+    if scrape_scheduler.get_job(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if not scrape_scheduler.cancel(job_id):
+        return jsonify({'error': 'Only queued jobs can be cancelled'}), 409
+    return jsonify({'message': 'Job cancelled', 'job': scrape_scheduler.get_job(job_id).to_dict()})
+
 @app.route('/reviews', methods=['GET'])
 def get_reviews():
     review_type = request.args.get('type', 'all')
@@ -1072,35 +4400,27 @@ def submit_review():
         }
         
         reviews_db[data['type']].append(new_review)
+        data_versions.bump('reviews')
         return jsonify({'message': 'Review submitted successfully', 'review': new_review})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def analyze_symptoms(query):
-    """Enhanced symptom analysis with better NLP and multi-word detection"""
-    # Normalize the query
-    query_normalized = normalize_query(query)
-    
-    # Extract words and phrases
-    words = re.findall(r'\b\w+\b', query_normalized.lower())
-    
-    # Also check for multi-word symptoms
-    query_lower = query_normalized.lower()
-    
-    # Check symptoms against our database
+def match_symptoms(matches):
+    """Symptoms (whole words, or phrases anywhere) and their possible conditions"""
     possible_conditions = set()
     matched_symptoms = []
-    
-    # Check multi-word symptoms first
-    for symptom, conditions in medical_db['symptoms_database'].items():
-        if ' ' in symptom:  # Multi-word symptom
-            if symptom in query_lower:
-                possible_conditions.update(conditions)
-                matched_symptoms.append(symptom)
-        else:  # Single word
-            if symptom in words:
-                possible_conditions.update(conditions)
-                matched_symptoms.append(symptom)
+    for keyword in matched_keywords(matches, 'symptom'):
+        possible_conditions.update(keyword.payload)
+        matched_symptoms.append(keyword.text)
+    return matched_symptoms, possible_conditions
+
+def analyze_symptoms(query):
+    """Enhanced symptom analysis with better NLP and multi-word detection"""
+    return as_query_analysis(query).symptoms
+
+def build_symptom_analysis(analysis):
+    """Confidence, recommendation and urgency for the symptoms found in a query"""
+    matched_symptoms, possible_conditions = analysis.symptom_matches
     
     # Enhanced confidence calculation
     base_confidence = 0.3
@@ -1112,42 +4432,38 @@ def analyze_symptoms(query):
     condition_boost = min(len(possible_conditions), 4) * 0.08
     
     # Check for severity keywords
-    severity_keywords = ['severe', 'intense', 'unbearable', 'extreme', 'terrible', 'sharp', 
-                         'chronic', 'constant', 'persistent', 'recurring']
-    has_severity = any(keyword in query_lower for keyword in severity_keywords)
+    has_severity = bool(matched_keywords(analysis.normalized_matches, 'severity'))
     severity_boost = 0.1 if has_severity else 0
     
     confidence = round(min(base_confidence + symptom_boost + condition_boost + severity_boost, 0.95), 2)
     
     # Generate more detailed recommendations
-    recommendation = get_detailed_recommendation(possible_conditions, matched_symptoms, query_lower)
+    recommendation = get_detailed_recommendation(possible_conditions, matched_symptoms, analysis.normalized,
+                                                 urgency=analysis.urgency)
     
     ai_analysis = {
         'possible_conditions': list(possible_conditions),
         'matched_symptoms': matched_symptoms,
         'confidence_score': confidence,
         'recommendation': recommendation,
-        'urgency': assess_urgency(matched_symptoms, query_lower),
+        'urgency': analysis.urgency,
         'disclaimer': "This is not a medical diagnosis. Please consult with a healthcare professional for proper medical advice."
     }
 
     return ai_analysis
 
 def assess_urgency(symptoms, query):
-    """Assess urgency level based on symptoms"""
-    emergency_keywords = ['chest pain', 'cant breathe', 'difficulty breathing', 'severe', 
-                          'bleeding', 'unconscious', 'seizure', 'stroke', 'heart attack',
-                          'suicide', 'overdose', 'severe pain']
-    
-    urgent_keywords = ['fever', 'vomiting', 'severe headache', 'confusion', 'dizziness']
+    """Assess urgency level based on symptoms.
+    `query` is the normalized query text or its keyword matches.
+    """
+    matches = keyword_matcher().find(query) if isinstance(query, str) else query
     
     # Check for emergency symptoms
-    for keyword in emergency_keywords:
-        if keyword in query:
-            return 'emergency'
+    if matched_keywords(matches, 'emergency'):
+        return 'emergency'
     
     # Check for urgent symptoms
-    urgent_count = sum(1 for keyword in urgent_keywords if keyword in query)
+    urgent_count = len(matched_keywords(matches, 'urgent'))
     if urgent_count >= 2:
         return 'urgent'
     
@@ -1157,12 +4473,13 @@ def assess_urgency(symptoms, query):
     
     return 'routine'
 
-def get_detailed_recommendation(conditions, symptoms, query):
+def get_detailed_recommendation(conditions, symptoms, query, urgency=None):
     """Generate detailed recommendations based on conditions and context"""
     if not conditions and not symptoms:
         return "No specific conditions identified. Please consult a healthcare provider for proper evaluation."
     
-    urgency = assess_urgency(symptoms, query)
+    if urgency is None:
+        urgency = assess_urgency(symptoms, query)
     
     if urgency == 'emergency':
         return "⚠️ URGENT: Based on your symptoms, seek immediate medical attention. Call 911 or go to the nearest emergency room."
@@ -1178,15 +4495,9 @@ def get_detailed_recommendation(conditions, symptoms, query):
         recommendation = "Your symptoms may indicate several possible conditions. Consider scheduling an appointment with your healthcare provider for evaluation. "
         
         # Add specialty recommendations
-        specialties = []
-        conditions_lower = [c.lower() for c in conditions]
-        
-        if any('heart' in c or 'cardiac' in c for c in conditions_lower):
-            specialties.append("cardiology")
-        if any('skin' in c or 'rash' in c for c in conditions_lower):
-            specialties.append("dermatology")
-        if any('mental' in c or 'anxiety' in c or 'depression' in c for c in conditions_lower):
-            specialties.append("psychiatry or mental health")
+        specialties = {specialty for condition in conditions for specialty in specialties_for_condition(condition)}
+        specialties = [SPECIALTY_LABELS.get(specialty, specialty.lower())
+                       for specialty in sorted(specialties - {DEFAULT_SPECIALTY})]
         
         if specialties:
             recommendation += f"You may want to consult with a specialist in {' or '.join(specialties)}."
@@ -1201,6 +4512,12 @@ def update_location():
         data = request.json
         if not data or 'latitude' not in data or 'longitude' not in data:
             return jsonify({'success': False, 'error': 'Invalid location data'}), 400
+        try:
+            on_globe = valid_coordinates(float(data['latitude']), float(data['longitude']))
+        except (TypeError, ValueError):
+            on_globe = False
+        if not on_globe:
+            return jsonify({'success': False, 'error': 'Invalid location data'}), 400
 
         # Store location with timestamp and source
         location_data = {
@@ -1211,13 +4528,19 @@ def update_location():
             'timestamp': datetime.now().isoformat()
         }
         
+        # Resolve the coordinates to the geo-bucket used for cache and scrape lookups
+        place = gazetteer.from_coordinates(data['latitude'], data['longitude'])
+        location_data['location_key'] = place.key
+        location_data['location_name'] = place.name
+        
         # In production, you would store this in a database
         # For demo, we're using a simple in-memory dictionary
         user_locations[request.remote_addr] = location_data
         
         return jsonify({
             'success': True,
-            'message': 'Location updated successfully'
+            'message': 'Location updated successfully',
+            'location': place.to_dict()
         })
     except Exception as e:
         return jsonify({
@@ -1226,4 +4549,6 @@ def update_location():
         }), 500
 
 if __name__ == '__main__':
+    if SCRAPER_REPLAY_DIR:
+        enable_replay(SCRAPER_REPLAY_DIR)
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,196 @@
+# Replay recorded Google pages through the real scraper code.
+#
+# ReplayDriver stands in for a Selenium Chrome driver and ReplayServer stands in
+# for the search page, both backed by the HTML fixtures in fixtures/replay:
+#   maps_feed.html    - a Google Maps results feed (div.Nv2PK cards)
+#   maps_detail.html  - detail panes, one div[data-result-index] per feed card
+#   search.html       - a Google search results page (div.g blocks)
+# Latencies (seconds) can be simulated for page loads, scrolls and clicks.
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'replay')
+
+# Simulated latency per action, in seconds
+NO_LATENCY = {'page': 0, 'scroll': 0, 'click': 0}
+LIVE_LATENCY = {'page': 1.5, 'scroll': 0.8, 'click': 0.6}
+
+# Feed cards revealed per scroll, mimicking Google Maps' lazy loading
+FEED_BATCH = 4
+
+def resolve_fixture(url):
+    """Map a scraped URL to the fixture file that recorded it"""
+    path = urlparse(url).path
+    if path.startswith('/maps/search'):
+        return 'maps_feed.html'
+    if path.startswith('/search'):
+        return 'search.html'
+    return None
+
+def load_fixture(fixtures_dir, name):
+    with open(os.path.join(fixtures_dir, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+class ReplayElement:
+    """The subset of a Selenium WebElement the scrapers use"""
+
+    def __init__(self, tag, on_click=None):
+        self._tag = tag
+        self._on_click = on_click
+
+    @property
+    def text(self):
+        return self._tag.get_text(' ', strip=True)
+
+    def get_attribute(self, name):
+        value = self._tag.get(name)
+        return ' '.join(value) if isinstance(value, list) else value
+
+    def click(self):
+        if self._on_click:
+            self._on_click()
+
+class ReplayDriver:
+    """Fake Chrome driver that serves recorded pages instead of live Google"""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency=None, batch=FEED_BATCH):
+        self.fixtures_dir = fixtures_dir
+        self.latency = dict(NO_LATENCY, **(latency or {}))
+        self.batch = batch
+        self.current_url = 'about:blank'
+        self._html = ''
+        self._page = BeautifulSoup('', 'html.parser')
+        self._detail = None
+        self._details = None
+        self._visible = 0
+
+    def _sleep(self, action):
+        if self.latency[action]:
+            time.sleep(self.latency[action])
+
+    def _cards(self):
+        return self._page.select('div.Nv2PK')
+
+    def set_page_load_timeout(self, timeout):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        pass
+
+    def get(self, url):
+        self._sleep('page')
+        name = resolve_fixture(url)
+        self._html = load_fixture(self.fixtures_dir, name) if name else '<html></html>'
+        self._page = BeautifulSoup(self._html, 'html.parser')
+        self._detail = None
+        self._visible = min(self.batch, len(self._cards()))
+        self.current_url = url
+
+    @property
+    def page_source(self):
+        # Only the cards scrolled into view so far are in the DOM
+        page = BeautifulSoup(self._html, 'html.parser')
+        for card in page.select('div.Nv2PK')[self._visible:]:
+            card.decompose()
+        if self._detail is not None:
+            page.append(BeautifulSoup(str(self._detail), 'html.parser'))
+        return str(page)
+
+    def execute_script(self, script, *args):
+        if 'return' in script and 'scrollHeight' in script:
+            return self._visible * 100
+        if 'scrollTop' in script:
+            self._sleep('scroll')
+            self._visible = min(self._visible + self.batch, len(self._cards()))
+        return None
+
+    def _open_detail(self, index):
+        self._sleep('click')
+        if self._details is None:
+            self._details = BeautifulSoup(load_fixture(self.fixtures_dir, 'maps_detail.html'), 'html.parser')
+        self._detail = self._details.select_one(f'div[data-result-index="{index}"]')
+
+    def find_elements(self, by=By.CSS_SELECTOR, value=None):
+        if by != By.CSS_SELECTOR:
+            raise NotImplementedError(f"ReplayDriver only supports CSS selectors, got {by}")
+
+        found = []
+        if self._detail is not None:
+            found.extend(ReplayElement(tag) for tag in self._detail.select(value))
+
+        # Compare by identity: bs4 tags with equal markup compare equal
+        cards = self._cards()
+        card_index = {id(card): i for i, card in enumerate(cards)}
+        hidden = {id(tag) for card in cards[self._visible:] for tag in [card, *card.descendants]}
+        for tag in self._page.select(value):
+            if id(tag) in hidden:
+                continue
+            if id(tag) in card_index:
+                index = card_index[id(tag)]
+                found.append(ReplayElement(tag, on_click=lambda i=index: self._open_detail(i)))
+            else:
+                found.append(ReplayElement(tag))
+        return found
+
+    def find_element(self, by=By.CSS_SELECTOR, value=None):
+        found = self.find_elements(by, value)
+        if not found:
+            raise NoSuchElementException(f"No element matches {value}")
+        return found[0]
+
+class ReplayServer:
+    """Local HTTP stand-in that serves recorded pages for the plain-HTTP fetcher"""
+
+    def __init__(self, fixtures_dir=FIXTURES_DIR, latency=None, host='127.0.0.1', port=0):
+        self.fixtures_dir = fixtures_dir
+        self.latency = dict(NO_LATENCY, **(latency or {}))
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if server.latency['page']:
+                    time.sleep(server.latency['page'])
+                name = resolve_fixture(self.path)
+                if name is None:
+                    self.send_error(404)
+                    return
+                body = load_fixture(server.fixtures_dir, name).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='replay-server')
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
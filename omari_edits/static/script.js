@@ -37,6 +37,7 @@ document.querySelectorAll('a[href^="#"]').forEach(anchor => {
 let currentLocation = '';
 let scrapingInProgress = false;
 let progressCheckInterval = null;
+let progressStream = null;
 
 // Location Services Handler
 function updateLocationData() {
@@ -69,10 +70,12 @@ function startLiveScraping() {
         .then(data => {
             console.log('Scraping started:', data);
 
-            // Start polling for progress updates
-            progressCheckInterval = setInterval(() => {
-                checkScrapingProgress();
-            }, 2000); // Check every 2 seconds
+            // Prefer the live event stream; older browsers poll instead
+            if (window.EventSource) {
+                streamScrapingProgress();
+            } else {
+                startProgressPolling();
+            }
         })
         .catch(error => {
             console.error('Error starting scraping:', error);
@@ -81,6 +84,76 @@ function startLiveScraping() {
         });
 }
 
+// Start polling for progress updates
+function startProgressPolling() {
+    clearInterval(progressCheckInterval);
+    progressCheckInterval = setInterval(() => {
+        checkScrapingProgress();
+    }, 2000); // Check every 2 seconds
+}
+
+// Stop live updates and load the final results from cache
+function finishLiveScraping() {
+    clearInterval(progressCheckInterval);
+    if (progressStream) {
+        progressStream.close();
+        progressStream = null;
+    }
+    scrapingInProgress = false;
+    hideLoadingIndicators();
+    updateProviderData();
+}
+
+// Stream scraping progress; the server only sends new providers and status changes
+function streamScrapingProgress() {
+    const liveProviders = [];
+    const source = new EventSource(`/scraping-progress/stream?location=${encodeURIComponent(currentLocation)}`);
+    progressStream = source;
+
+    function showProviders(providers) {
+        liveProviders.length = 0;
+        liveProviders.push(...providers);
+        updateHealthcareTable(liveProviders);
+    }
+
+    source.addEventListener('snapshot', event => {
+        const data = JSON.parse(event.data);
+        if (data.healthcare) {
+            showProviders(data.healthcare.providers);
+        }
+    });
+
+    source.addEventListener('provider', event => {
+        const data = JSON.parse(event.data);
+        if (data.type === 'healthcare') {
+            liveProviders.push(data.provider);
+            updateHealthcareTable(liveProviders);
+        }
+    });
+
+    source.addEventListener('status', event => {
+        const data = JSON.parse(event.data);
+        // Failed scrapes replace the list with fallback providers
+        if (data.type === 'healthcare' && data.providers) {
+            showProviders(data.providers);
+        }
+    });
+
+    source.addEventListener('done', () => {
+        console.log('Live scraping complete');
+        finishLiveScraping();
+    });
+
+    source.onerror = () => {
+        // Stream dropped or unsupported by a proxy; fall back to polling
+        source.close();
+        progressStream = null;
+        if (scrapingInProgress) {
+            startProgressPolling();
+        }
+    };
+}
+
 // Check scraping progress and update tables
 function checkScrapingProgress() {
     fetch(`/scraping-progress?location=${currentLocation}&type=all`)
@@ -91,23 +164,19 @@ function checkScrapingProgress() {
                 updateHealthcareTable(data.healthcare.providers);
 
                 // Check if healthcare scraping is complete
-                if (data.healthcare.status === 'complete' || data.healthcare.status === 'failed') {
+                if (isScrapeFinished(data.healthcare.status)) {
                     console.log('Healthcare scraping complete');
                 }
             }
 
             // Insurance provider live table removed (now integrated in search results)
 
-            // Stop polling if both are complete
+            // Stop polling once both are complete and the results are stored
             if (data.healthcare && data.insurance &&
-                (data.healthcare.status === 'complete' || data.healthcare.status === 'failed') &&
-                (data.insurance.status === 'complete' || data.insurance.status === 'failed')) {
-                clearInterval(progressCheckInterval);
-                scrapingInProgress = false;
-                hideLoadingIndicators();
-
+                isScrapeFinished(data.healthcare.status) &&
+                isScrapeFinished(data.insurance.status) && !data.scraping) {
                 // Final update from cache
-                updateProviderData();
+                finishLiveScraping();
             }
         })
         .catch(error => {
@@ -115,6 +184,10 @@ function checkScrapingProgress() {
         });
 }
 
+function isScrapeFinished(status) {
+    return status === 'complete' || status === 'failed' || status === 'cancelled';
+}
+
 // Show loading indicators
 function showLoadingIndicators() {
     const healthcareTableBody = document.getElementById('provider-graph-body');
@@ -202,7 +275,7 @@ function updateHealthcareTable(providers) {
 
         // Distance
         const distanceCell = document.createElement('td');
-        if (provider.distance) {
+        if (provider.distance != null) {
             distanceCell.textContent = `${provider.distance.toFixed(1)} mi`;
         } else {
             distanceCell.textContent = 'N/A';
@@ -389,7 +462,7 @@ function updateProviderData() {
 
                 // Distance
                 const distanceCell = document.createElement('td');
-                if (provider.distance) {
+                if (provider.distance != null) {
                     distanceCell.textContent = `${provider.distance.toFixed(1)} mi`;
                 } else {
                     distanceCell.textContent = 'N/A';
@@ -586,6 +659,11 @@ document.addEventListener('DOMContentLoaded', () => {
                     locationBtn.classList.add('active');
                     locationStatus.textContent = '✓';
                     console.log('Location updated successfully');
+                    // Device coordinates: look providers up by the server's canonical location
+                    if (accuracy !== null && data.location) {
+                        currentLocation = data.location.name;
+                        updateLocationData();
+                    }
                 }
             })
             .catch(error => {
@@ -681,6 +759,40 @@ document.addEventListener('DOMContentLoaded', () => {
             const locationSelect = document.getElementById('locationSelect'); // optional
             const resultsContainer = document.getElementById('searchResults');
             const loadingSpinner = document.getElementById('loading-spinner');
+            const suggestionList = document.getElementById('searchSuggestions');
+
+            // Typeahead: ask /suggest for completions as the user types
+            if (searchInput && suggestionList) {
+                let suggestTimer = null;
+                let latestSuggest = 0;
+                searchInput.addEventListener('input', () => {
+                    clearTimeout(suggestTimer);
+                    const query = searchInput.value;
+                    if (!query.trim()) {
+                        suggestionList.innerHTML = '';
+                        return;
+                    }
+                    suggestTimer = setTimeout(async() => {
+                        const requestId = ++latestSuggest;
+                        try {
+                            const response = await fetch(`/suggest?q=${encodeURIComponent(query)}`);
+                            if (!response.ok) return;
+                            const data = await response.json();
+                            // Ignore answers to queries the user has already typed past
+                            if (requestId !== latestSuggest) return;
+                            suggestionList.innerHTML = '';
+                            data.suggestions.forEach(suggestion => {
+                                const option = document.createElement('option');
+                                option.value = suggestion.text;
+                                option.label = suggestion.kind;
+                                suggestionList.appendChild(option);
+                            });
+                        } catch (error) {
+                            console.error('Suggest error:', error);
+                        }
+                    }, 120);
+                });
+            }
 
             if (searchForm) {
                 searchForm.addEventListener('submit', async(e) => {
@@ -741,7 +853,7 @@ document.addEventListener('DOMContentLoaded', () => {
                                     const phone = clinic.phone || '';
                                     const website = clinic.website || clinic.url || '';
                                     const rating = clinic.rating ? `⭐ ${clinic.rating}` : '';
-                                    const distance = clinic.distance ? ` • ${clinic.distance.toFixed(1)} mi away` : '';
+                                    const distance = clinic.distance != null ? ` • ${clinic.distance.toFixed(1)} mi away` : '';
                                     const suggestedFor = clinic.suggested_for ? `<p class="suggested"><em>Suggested for: ${clinic.suggested_for.join(', ')}</em></p>` : '';
 
                                     html += `